@@ -4,7 +4,5 @@ if [ -f .env ]; then
     export $(cat .env | sed 's/#.*//g' | xargs)
 fi
 
-python src/consumer.py
-
-echo "Sleeping for 100 seconds"
-sleep 100
\ No newline at end of file
+# the supervisor restarts crashed workers itself, its exit status is the script's
+exec python src/supervisor.py
\ No newline at end of file
@@ -3,9 +3,10 @@ from typing import Optional
 from openai.types.beta.threads import ThreadMessage
 from openai.pagination import SyncCursorPage
 from utils.coala import CoALA
-from utils.ops_api_handler import create_message_runstep
+from utils.ops_api_handler import OpsBatch
 from utils.tools import ActionItem, Actions, actions_to_map
 from utils.openai_clients import litellm_client, assistants_client
+from utils.streaming import STREAM_RESPONSES, stream_section
 from data_models import run
 import os
 
@@ -31,7 +32,12 @@ class FinalAnswer:
         messages: SyncCursorPage[ThreadMessage],
         runsteps: SyncCursorPage[run.RunStep],
         content: Optional[str] = None,
+        run_update: Optional[run.RunUpdate] = None,
     ) -> run.RunStep:
+        """
+        Generate the final answer and commit it as a message run step. When
+        `run_update` is given it is committed together with the run step.
+        """
         if not content:
             # Compose the prompt for the summarization task
             coala = CoALA(
@@ -49,16 +55,28 @@ class FinalAnswer:
                     "content": prompt,
                 },
             ]
-            response = litellm_client.chat.completions.create(
-                model=os.getenv("LITELLM_MODEL"),  # Replace with your model of choice
-                messages=generator_messages,
-                max_tokens=500,  # You may adjust the token limit as necessary
-            )
-            content = response.choices[0].message.content
-            content = content.split("Final Answer: ", 1)[1]
+            if STREAM_RESPONSES:
+                # users see the answer as it is generated
+                content = stream_section(
+                    self.thread_id,
+                    self.run_id,
+                    generator_messages,
+                    max_tokens=500,
+                    start_marker="Final Answer: ",
+                )
+            else:
+                response = litellm_client.chat.completions.create(
+                    model=os.getenv("LITELLM_MODEL"),  # Replace with your model of choice
+                    messages=generator_messages,
+                    max_tokens=500,  # You may adjust the token limit as necessary
+                )
+                content = response.choices[0].message.content
+                content = content.split("Final Answer: ", 1)[1]
 
-        run_step = create_message_runstep(
-            self.thread_id, self.run_id, self.assistant_id, content
-        )
+        batch = OpsBatch(self.thread_id, self.run_id, self.assistant_id)
+        batch.add_message_runstep(content)
+        if run_update is not None:
+            batch.set_run_update(run_update)
+        run_step = batch.flush().runsteps[0]
         print("Final answer content: ", content)
         return run_step
@@ -6,6 +6,7 @@ from utils.weaviate_utils import retrieve_file_chunks
 from utils.ops_api_handler import create_retrieval_runstep
 from utils.tools import ActionItem, Actions, actions_to_map
 from utils.openai_clients import litellm_client, assistants_client
+from utils.metadata_cache import metadata_cache
 from data_models import run
 import os
 
@@ -73,13 +74,10 @@ Only respond with the query iteself NOTHING ELSE."""
     def compose_file_list(
         self,
     ) -> str:
-        assistant = assistants_client.beta.assistants.retrieve(
-            assistant_id=self.assistant_id,
-        )
+        assistant = metadata_cache.get_assistant(self.assistant_id)
         self.assistant = assistant
         files_names = []
-        for file_id in assistant.file_ids:
-            file = assistants_client.files.retrieve(file_id)
+        for file in metadata_cache.get_files(assistant.file_ids):
             files_names.append(f"- {file.filename}")
         return "\n".join(files_names)
 
@@ -6,6 +6,7 @@ from utils.coala import CoALA
 from utils.ops_api_handler import create_message_runstep
 from utils.tools import ActionItem, Actions, actions_to_map
 from utils.openai_clients import litellm_client, assistants_client
+from utils.streaming import STREAM_RESPONSES, stream_section
 from data_models import run
 import os
 
@@ -49,16 +50,26 @@ class TextGeneration:
                     "content": prompt,
                 },
             ]
-            response = litellm_client.chat.completions.create(
-                model=os.getenv("LITELLM_MODEL"),  # Replace with your model of choice
-                messages=generator_messages,
-                max_tokens=500,  # You may adjust the token limit as necessary
-            )
-            content = response.choices[0].message.content
-            print("\n\nTEXTGENERATOR RESPONSE:\n", content)
-            content = content.split("Thought:", 1)[1]
-            print("\n\nTEXTGENERATOR RESPONSE SPLIT:\n", content)
-            content = content.split("Action:", 1)[0]
+            if STREAM_RESPONSES:
+                content = stream_section(
+                    self.thread_id,
+                    self.run_id,
+                    generator_messages,
+                    max_tokens=500,
+                    start_marker="Thought:",
+                    end_marker="Action:",
+                )
+            else:
+                response = litellm_client.chat.completions.create(
+                    model=os.getenv("LITELLM_MODEL"),  # Replace with your model of choice
+                    messages=generator_messages,
+                    max_tokens=500,  # You may adjust the token limit as necessary
+                )
+                content = response.choices[0].message.content
+                print("\n\nTEXTGENERATOR RESPONSE:\n", content)
+                content = content.split("Thought:", 1)[1]
+                print("\n\nTEXTGENERATOR RESPONSE SPLIT:\n", content)
+                content = content.split("Action:", 1)[0]
 
         run_step = create_message_runstep(
             self.thread_id, self.run_id, self.assistant_id, content
@@ -2,7 +2,7 @@ from openai.types.beta.threads import ThreadMessage
 from openai.pagination import SyncCursorPage
 from constants import PromptKeys
 from utils.tools import ActionItem
-from utils.openai_clients import litellm_client
+from utils.response_cache import response_cache
 import os
 
 
@@ -52,14 +52,15 @@ The tools available to you are:
                 }
             )
         print("MESSAGES: ", messages)
-        response = litellm_client.chat.completions.create(
+        # identical histories (retries, re-queued runs) reuse the decision
+        content = response_cache.create_completion(
             model=os.getenv("LITELLM_MODEL"),
             messages=messages,
             max_tokens=500,
         )
 
-        print("GENERATION: ", response.choices[0].message.content)
-        if PromptKeys.TRANSITION.value in response.choices[0].message.content:
+        print("GENERATION: ", content)
+        if PromptKeys.TRANSITION.value in content:
             return PromptKeys.TRANSITION.value
         else:
-            return response.choices[0].message.content
+            return content
@@ -1,7 +1,7 @@
 from openai.types.beta.threads import ThreadMessage
 from openai.pagination import SyncCursorPage
 from utils.tools import ActionItem
-from utils.openai_clients import litellm_client
+from utils.response_cache import response_cache
 import os
 
 
@@ -38,15 +38,12 @@ class SummarizerAgent:
         modified_prompt = self.compose_prompt(tools, latest_message)
         messages[-1]["content"] = modified_prompt
 
-        # Call to the AI model to generate the summary
-        response = litellm_client.chat.completions.create(
+        # Call to the AI model to generate the summary, cached per history
+        summary = response_cache.create_completion(
             model=os.getenv("LITELLM_MODEL"),
             messages=messages,
             max_tokens=1000,  # You may adjust the token limit as necessary
         )
-
-        # Extract the summary from the response
-        summary = response.choices[0].message.content
         return summary
 
     def compose_prompt(self, tools: dict[str, ActionItem], latest_message: str) -> str:
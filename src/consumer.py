@@ -1,9 +1,12 @@
+import asyncio
 import threading
 from concurrent.futures import ThreadPoolExecutor
+import functools
+import aio_pika
 import pika
 import os
 from dotenv import load_dotenv
-from run_executor.main import ExecuteRun
+from run_executor.main import AsyncExecuteRun, ExecuteRun
 import json
 
 load_dotenv()
@@ -13,10 +16,18 @@ RABBITMQ_PASS = os.getenv("RABBITMQ_PASS")
 RABBITMQ_HOST = os.getenv("RABBITMQ_HOST")
 RABBITMQ_PORT = os.getenv("RABBITMQ_PORT")
 
+# "async" keeps many runs in flight on one event loop, "threaded" is the
+# original BlockingConnection + thread pool consumer
+CONSUMER_MODE = os.getenv("CONSUMER_MODE", "async")
+# Unacked messages the broker may push to this process
+RABBITMQ_PREFETCH = int(os.getenv("RABBITMQ_PREFETCH", "200"))
+# Upper bound on ExecuteRun instances running at the same time
+RUN_CONCURRENCY = int(os.getenv("RUN_CONCURRENCY", "200"))
+
 
 class RabbitMQConsumer:
     def __init__(
-        self, max_workers=5
+        self, max_workers=5, prefetch_count=None, on_processed=None
     ):  # max_workers can be adjusted based on demand # noqa
         credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
         self.connection = pika.BlockingConnection(
@@ -28,7 +39,13 @@ class RabbitMQConsumer:
             )
         )
         self.channel = self.connection.channel()
+        # never hold more messages than there are workers to run them
+        self.channel.basic_qos(prefetch_count=prefetch_count or max_workers)
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # futures of in-flight runs, drained by start_consuming after stop()
+        self.pending = set()
+        # called with True/False after every message, used for throughput stats
+        self.on_processed = on_processed
 
     def process_message(self, body):
         message = body.decode("utf-8")
@@ -41,18 +58,29 @@ class RabbitMQConsumer:
 
     def callback(self, ch, method, properties, body):
         try:
-            self.executor.submit(self.process_message_and_ack, body, ch, method)
+            future = self.executor.submit(self.process_message_and_ack, body, ch, method)
+            self.pending.add(future)
+            future.add_done_callback(self.pending.discard)
         except Exception as e:
             print(f"Failed to submit the task to the executor: {e}")
 
     def process_message_and_ack(self, body, ch, method):
+        # pika channels are not thread-safe, so acks are scheduled back onto
+        # the connection's own thread instead of being sent from the worker
+        success = True
         try:
             self.process_message(body)
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            ack = functools.partial(ch.basic_ack, delivery_tag=method.delivery_tag)
         except Exception as e:
             print(f"Failed to process message {body}: {e}")
+            success = False
             # Here you can decide whether to reject, requeue or just log the exception
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            ack = functools.partial(
+                ch.basic_nack, delivery_tag=method.delivery_tag, requeue=False
+            )
+        self.connection.add_callback_threadsafe(ack)
+        if self.on_processed:
+            self.on_processed(success)
 
     def start_consuming(self, queue_name):
         self.channel.queue_declare(queue=queue_name, durable=True)
@@ -61,7 +89,127 @@ class RabbitMQConsumer:
         )
         print("Waiting for messages. To exit press CTRL+C")
         self.channel.start_consuming()
+        # stop() was called: keep servicing heartbeats and sending the acks the
+        # workers schedule while in-flight runs finish, instead of blocking the
+        # connection thread until they are all done
+        while self.pending:
+            self.connection.process_data_events(time_limit=1)
+        self.executor.shutdown(wait=True)
+        # flush the acks of the runs that finished during the last pass
+        self.connection.process_data_events(time_limit=0)
+        self.connection.close()
+
+    def stop(self):
+        """
+        Stop receiving new messages. Safe to call from a signal handler or
+        another thread, in-flight runs are drained by start_consuming.
+        """
+        self.connection.add_callback_threadsafe(self.channel.stop_consuming)
+
+
+class AsyncRabbitMQConsumer:
+    def __init__(
+        self,
+        prefetch_count: int = RABBITMQ_PREFETCH,
+        max_concurrency: int = RUN_CONCURRENCY,
+        on_processed=None,
+    ):
+        """
+        asyncio consumer: messages are received and acked on the event loop,
+        runs execute as AsyncExecuteRun tasks capped by a semaphore. Blocking
+        agent and action calls inside a run go to the loop's thread pool.
+
+        prefetch_count: unacked messages the broker may deliver to us
+        max_concurrency: runs allowed to execute at the same time
+        on_processed: called with True/False after every message
+        """
+        self.prefetch_count = prefetch_count
+        self.max_concurrency = max_concurrency
+        self.connection: aio_pika.abc.AbstractRobustConnection = None
+        self.channel: aio_pika.abc.AbstractChannel = None
+        self.semaphore: asyncio.Semaphore = None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.tasks: set[asyncio.Task] = set()
+        self.on_processed = on_processed
+        self.stopping = asyncio.Event()
+
+    async def connect(self):
+        self.connection = await aio_pika.connect_robust(
+            host=RABBITMQ_HOST,
+            port=int(RABBITMQ_PORT or 5672),
+            login=RABBITMQ_USER,
+            password=RABBITMQ_PASS,
+            heartbeat=30,
+        )
+        self.channel = await self.connection.channel()
+        await self.channel.set_qos(prefetch_count=self.prefetch_count)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        # asyncio.to_thread inside AsyncExecuteRun uses the default executor
+        asyncio.get_running_loop().set_default_executor(self.executor)
+
+    async def process_message(self, body):
+        message = body.decode("utf-8")
+        data = json.loads(message)
+
+        print(f"Processing {data}")
+        run = AsyncExecuteRun(data["thread_id"], data["run_id"])
+        await run.execute()
+
+    async def process_message_and_ack(
+        self, message: aio_pika.abc.AbstractIncomingMessage
+    ):
+        async with self.semaphore:
+            try:
+                await self.process_message(message.body)
+            except Exception as e:
+                print(f"Failed to process message {message.body}: {e}")
+                await message.nack(requeue=False)
+                if self.on_processed:
+                    self.on_processed(False)
+                return
+        # back on the connection's loop, safe to talk to the channel
+        await message.ack()
+        if self.on_processed:
+            self.on_processed(True)
+
+    async def callback(self, message: aio_pika.abc.AbstractIncomingMessage):
+        task = asyncio.create_task(self.process_message_and_ack(message))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def start_consuming(self, queue_name):
+        if self.connection is None:
+            await self.connect()
+        queue = await self.channel.declare_queue(queue_name, durable=True)
+        consumer_tag = await queue.consume(self.callback, no_ack=False)
+        print(
+            f"Waiting for messages (prefetch={self.prefetch_count}, "
+            f"concurrency={self.max_concurrency}). To exit press CTRL+C"
+        )
+        await self.stopping.wait()
+        # drain: stop deliveries, then wait for in-flight runs to ack
+        await queue.cancel(consumer_tag)
+        await self.close()
+
+    def stop(self):
+        """
+        Stop receiving new messages and drain in-flight runs. Must be called
+        on the consumer's event loop (e.g. from loop.add_signal_handler).
+        """
+        self.stopping.set()
+
+    async def close(self):
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.connection is not None:
+            await self.connection.close()
+        self.executor.shutdown(wait=True)
 
 
-consumer = RabbitMQConsumer()
-consumer.start_consuming("runs_queue")
+if __name__ == "__main__":
+    if CONSUMER_MODE == "threaded":
+        consumer = RabbitMQConsumer()
+        consumer.start_consuming("runs_queue")
+    else:
+        consumer = AsyncRabbitMQConsumer()
+        asyncio.run(consumer.start_consuming("runs_queue"))
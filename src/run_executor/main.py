@@ -1,17 +1,41 @@
-from typing import Dict, Any, Optional, List
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 from constants import PromptKeys
 from utils.tools import ActionItem, Actions, tools_to_map
-from utils.ops_api_handler import create_message_runstep, update_run
+from utils.ops_api_handler import OpsBatch, async_update_run, update_run
 from data_models import run
 from openai.types.beta.threads import ThreadMessage
-from utils.openai_clients import assistants_client
+from utils.openai_clients import assistants_client, async_assistants_client
 from openai.types.beta.thread import Thread
 from openai.types.beta import Assistant
 from openai.pagination import SyncCursorPage
 from agents import router, summarizer, orchestrator
 from actions import retrieval, text_generation, final_answer, web_retrieval
+from run_executor.state import RunState
+from utils.metadata_cache import metadata_cache
 import datetime
 
+# Run the summarizer alongside the router instead of after it. Saves one LLM
+# round trip on tool-using runs, costs one wasted summary on direct answers.
+SPECULATIVE_SUMMARY = os.getenv("SPECULATIVE_SUMMARY", "false").lower() in (
+    "1",
+    "true",
+)
+speculation_executor = ThreadPoolExecutor(max_workers=16)
+# summaries started speculatively, and whether they were used or thrown away
+speculation_metrics = {"launched": 0, "used": 0, "discarded": 0}
+_speculation_lock = threading.Lock()
+
+
+def record_speculation(outcome: str):
+    with _speculation_lock:
+        speculation_metrics[outcome] += 1
+        print("Speculative summary metrics: ", speculation_metrics)
+
+
 # TODO: add assistant and base tools off of assistant
 
 
@@ -28,6 +52,8 @@ class ExecuteRun:
         self.assistant: Optional[Assistant] = None
         self.tools_map: Optional[dict[str, ActionItem]] = None
         self.runsteps: Optional[SyncCursorPage[run.RunStep]] = None
+        # messages and run steps seen so far, refreshed incrementally
+        self.state = RunState(thread_id, run_id)
         # TODO: add assistant and base tools off of assistant
 
     def execute(self):
@@ -56,33 +82,42 @@ class ExecuteRun:
         )
         self.assistant_id = assistant.id
         self.assistant = assistant
+        # actions of this run read the assistant from the shared cache
+        metadata_cache.put_assistant(assistant)
         self.tools_map = tools_to_map(self.assistant.tools)
 
-        messages = assistants_client.beta.threads.messages.list(
-            thread_id=self.thread_id, order="asc"
-        )
-        self.messages = messages
+        self.messages = self.state.refresh_messages()
         print("\n\nMain Messages: ", self.messages, "\n\n")
 
         router_agent = router.RouterAgent()
+        summarizer_agent = summarizer.SummarizerAgent()
+        summary_future = None
+        if SPECULATIVE_SUMMARY:
+            summary_future = speculation_executor.submit(
+                summarizer_agent.generate, self.tools_map, self.messages
+            )
+            record_speculation("launched")
         router_response = router_agent.generate(self.tools_map, self.messages)
         print("Response: ", router_response, "\n\n")
         if router_response != PromptKeys.TRANSITION.value:
-            create_message_runstep(
-                self.thread_id, self.run_id, self.run.assistant_id, router_response
-            )
-            update_run(
-                self.thread_id,
-                self.run_id,
-                run.RunUpdate(status=run.RunStatus.COMPLETED.value),
+            if summary_future is not None:
+                summary_future.cancel()
+                record_speculation("discarded")
+            batch = OpsBatch(self.thread_id, self.run_id, self.run.assistant_id)
+            batch.add_message_runstep(router_response).set_run_update(
+                run.RunUpdate(status=run.RunStatus.COMPLETED.value)
             )
+            batch.flush()
             print("Generating response")
             print(f"Finished executing run {self.run_id}")
             return
         print("Transitioning")
 
-        summarizer_agent = summarizer.SummarizerAgent()
-        summary = summarizer_agent.generate(self.tools_map, self.messages)
+        if summary_future is not None:
+            summary = summary_future.result()
+            record_speculation("used")
+        else:
+            summary = summarizer_agent.generate(self.tools_map, self.messages)
         print("\n\nSummary: ", summary, "\n\n")
 
         orchestrator_agent = orchestrator.OrchestratorAgent(
@@ -100,16 +135,9 @@ class ExecuteRun:
             and t_loops < 5
         ):
             t_loops += 1
-            # Get updated run state
-            messages = assistants_client.beta.threads.messages.list(
-                thread_id=self.thread_id, order="asc"
-            )
+            # Get updated run state, only items newer than the last refresh
+            messages, runsteps = self.state.refresh()
             self.messages = messages
-            runsteps = assistants_client.beta.threads.runs.steps.list(
-                thread_id=self.thread_id,
-                run_id=self.run_id,
-                order="asc"
-            )
             self.runsteps = runsteps
 
             # Execute thought
@@ -121,7 +149,7 @@ class ExecuteRun:
                     self.tools_map,
                     summary,
                 )
-                action.generate(messages, runsteps)
+                self.state.add_runstep(action.generate(messages, runsteps))
                 continue
 
             # Execute orchestrator
@@ -135,7 +163,7 @@ class ExecuteRun:
                     self.tools_map,
                     summary,
                 )
-                action.generate(messages, runsteps)
+                self.state.add_runstep(action.generate(messages, runsteps))
                 continue
             if orchestrator_response == Actions.WEB_RETREIVAL: # TODO: Sean, entry point for web retrieval
                 action = web_retrieval.WebRetrieval(
@@ -145,7 +173,7 @@ class ExecuteRun:
                     self.tools_map,
                     summary,
                 )
-                action.generate(messages, runsteps)
+                self.state.add_runstep(action.generate(messages, runsteps))
                 continue
             if orchestrator_response == Actions.COMPLETION:
                 action = final_answer.FinalAnswer(
@@ -155,14 +183,14 @@ class ExecuteRun:
                     self.tools_map,
                     summary,
                 )
-                action.generate(messages, runsteps)
                 run_update = run.RunUpdate(
                     status=run.RunStatus.COMPLETED.value,
                     completed_at=runsteps.data[0].created_at,
                 )
-
-                # Call the API handler to update the run status
-                updated_run = update_run(self.thread_id, self.run_id, run_update)
+                # the run status update is committed with the final answer
+                self.state.add_runstep(
+                    action.generate(messages, runsteps, run_update=run_update)
+                )
                 continue
             # retrieve from website
             # 
@@ -186,3 +214,154 @@ class ExecuteRun:
 
     def get_run_artifacts(self) -> Dict[str, Any]:
         return {"artifacts": "artifacts"}
+
+
+class AsyncExecuteRun(ExecuteRun):
+    """
+    asyncio variant of ExecuteRun. Independent assistants API reads are
+    issued concurrently, blocking agent and action calls run in worker threads
+    so one event loop can keep many runs in flight.
+    """
+
+    async def fetch_run_and_assistant(
+        self,
+    ) -> Tuple[Optional[run.Run], Optional[Assistant]]:
+        # the assistant id is only known once the run has been updated
+        run_update = run.RunUpdate(status=run.RunStatus.IN_PROGRESS.value)
+        updated_run = await async_update_run(self.thread_id, self.run_id, run_update)
+        if not updated_run:
+            return None, None
+        assistant = await async_assistants_client.beta.assistants.retrieve(
+            assistant_id=updated_run.assistant_id,
+        )
+        return updated_run, assistant
+
+    async def fetch_run_state(self):
+        messages, runsteps = await asyncio.gather(
+            self.state.async_refresh_messages(),
+            self.state.async_refresh_runsteps(),
+        )
+        self.messages = messages
+        self.runsteps = runsteps
+        return messages, runsteps
+
+    async def execute(self):
+        (updated_run, assistant), thread, messages = await asyncio.gather(
+            self.fetch_run_and_assistant(),
+            async_assistants_client.beta.threads.retrieve(thread_id=self.thread_id),
+            self.state.async_refresh_messages(),
+        )
+
+        if not updated_run:
+            print(f"Error updating run status for {self.run_id}. Aborting execution.")
+            return
+
+        self.run = updated_run
+        print("Run: ", self.run, "\n\n")
+        self.thread = thread
+        self.assistant_id = assistant.id
+        self.assistant = assistant
+        metadata_cache.put_assistant(assistant)
+        self.tools_map = tools_to_map(self.assistant.tools)
+        self.messages = messages
+        print("\n\nMain Messages: ", self.messages, "\n\n")
+
+        router_agent = router.RouterAgent()
+        summarizer_agent = summarizer.SummarizerAgent()
+        summary_task = None
+        if SPECULATIVE_SUMMARY:
+            summary_task = asyncio.create_task(
+                asyncio.to_thread(
+                    summarizer_agent.generate, self.tools_map, self.messages
+                )
+            )
+            record_speculation("launched")
+        router_response = await asyncio.to_thread(
+            router_agent.generate, self.tools_map, self.messages
+        )
+        print("Response: ", router_response, "\n\n")
+        if router_response != PromptKeys.TRANSITION.value:
+            if summary_task is not None:
+                # the worker thread finishes on its own, its result is dropped
+                summary_task.cancel()
+                record_speculation("discarded")
+            batch = OpsBatch(self.thread_id, self.run_id, self.run.assistant_id)
+            batch.add_message_runstep(router_response).set_run_update(
+                run.RunUpdate(status=run.RunStatus.COMPLETED.value)
+            )
+            await asyncio.to_thread(batch.flush)
+            print(f"Finished executing run {self.run_id}")
+            return
+        print("Transitioning")
+
+        if summary_task is not None:
+            summary = await summary_task
+            record_speculation("used")
+        else:
+            summary = await asyncio.to_thread(
+                summarizer_agent.generate, self.tools_map, self.messages
+            )
+        print("\n\nSummary: ", summary, "\n\n")
+
+        orchestrator_agent = orchestrator.OrchestratorAgent(
+            self.run_id, self.thread_id, self.tools_map, summary
+        )
+        orchestrator_response = None
+        t_loops = 0
+        while (
+            orchestrator_response
+            not in [
+                Actions.COMPLETION,
+                Actions.FAILURE,
+            ]
+            and t_loops < 5
+        ):
+            t_loops += 1
+            messages, runsteps = await self.fetch_run_state()
+
+            action_args = (
+                self.run_id,
+                self.thread_id,
+                self.assistant_id,
+                self.tools_map,
+                summary,
+            )
+            # Execute thought
+            if len(runsteps.data) == 0 or runsteps.data[0].type == "tool_calls":
+                action = text_generation.TextGeneration(*action_args)
+                self.state.add_runstep(
+                    await asyncio.to_thread(action.generate, messages, runsteps)
+                )
+                continue
+
+            # Execute orchestrator
+            orchestrator_response = await asyncio.to_thread(
+                orchestrator_agent.generate, messages, runsteps
+            )
+            print("\n\nOrchestrator Response: ", orchestrator_response, "\n\n")
+            if orchestrator_response == Actions.RETRIEVAL:
+                action = retrieval.Retrieval(*action_args)
+                self.state.add_runstep(
+                    await asyncio.to_thread(action.generate, messages, runsteps)
+                )
+                continue
+            if orchestrator_response == Actions.WEB_RETREIVAL:
+                action = web_retrieval.WebRetrieval(*action_args)
+                self.state.add_runstep(
+                    await asyncio.to_thread(action.generate, messages, runsteps)
+                )
+                continue
+            if orchestrator_response == Actions.COMPLETION:
+                action = final_answer.FinalAnswer(*action_args)
+                run_update = run.RunUpdate(
+                    status=run.RunStatus.COMPLETED.value,
+                    completed_at=runsteps.data[0].created_at,
+                )
+                self.state.add_runstep(
+                    await asyncio.to_thread(
+                        action.generate, messages, runsteps, run_update=run_update
+                    )
+                )
+                continue
+
+        print(f"Finished executing run {self.run_id}. Total loops: {t_loops}")
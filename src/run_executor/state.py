@@ -0,0 +1,121 @@
+from typing import Generic, List, Optional, TypeVar
+from openai.types.beta.threads import ThreadMessage
+from data_models import run
+from utils.openai_clients import assistants_client, async_assistants_client
+
+T = TypeVar("T")
+
+# items requested per page when catching up with the assistants API
+PAGE_SIZE = 100
+
+
+class CachedPage(Generic[T]):
+    """
+    Minimal stand-in for SyncCursorPage over locally cached items, agents and
+    actions only read `.data` or iterate it.
+    """
+
+    def __init__(self, data: List[T]):
+        self.data = data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class RunState:
+    def __init__(self, thread_id: str, run_id: str, page_size: int = PAGE_SIZE):
+        """
+        Per-run cache of thread messages and run steps. Each refresh only
+        requests items created after the last one seen (`after` cursor),
+        and run steps created by this executor are appended directly.
+        """
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.page_size = page_size
+        self.messages: CachedPage[ThreadMessage] = CachedPage([])
+        self.runsteps: CachedPage[run.RunStep] = CachedPage([])
+        self.message_index: dict[str, ThreadMessage] = {}
+        self.runstep_ids: set[str] = set()
+        self.message_cursor: Optional[str] = None
+        self.runstep_cursor: Optional[str] = None
+
+    def get_message(self, message_id: str) -> Optional[ThreadMessage]:
+        return self.message_index.get(message_id)
+
+    def add_messages(self, messages: List[ThreadMessage]):
+        for message in messages:
+            if message.id in self.message_index:
+                continue
+            self.message_index[message.id] = message
+            self.messages.data.append(message)
+            self.message_cursor = message.id
+
+    def add_runsteps(self, runsteps: List[run.RunStep]):
+        for runstep in runsteps:
+            if runstep.id in self.runstep_ids:
+                continue
+            self.runstep_ids.add(runstep.id)
+            self.runsteps.data.append(runstep)
+            self.runstep_cursor = runstep.id
+
+    def add_runstep(self, runstep: Optional[run.RunStep]):
+        if runstep is not None:
+            self.add_runsteps([runstep])
+
+    def _message_args(self) -> dict:
+        args = {"thread_id": self.thread_id, "order": "asc", "limit": self.page_size}
+        if self.message_cursor:
+            args["after"] = self.message_cursor
+        return args
+
+    def _runstep_args(self) -> dict:
+        args = {
+            "thread_id": self.thread_id,
+            "run_id": self.run_id,
+            "order": "asc",
+            "limit": self.page_size,
+        }
+        if self.runstep_cursor:
+            args["after"] = self.runstep_cursor
+        return args
+
+    def refresh_messages(self, client=assistants_client):
+        while True:
+            page = client.beta.threads.messages.list(**self._message_args())
+            self.add_messages(page.data)
+            if len(page.data) < self.page_size:
+                break
+        return self.messages
+
+    def refresh_runsteps(self, client=assistants_client):
+        while True:
+            page = client.beta.threads.runs.steps.list(**self._runstep_args())
+            self.add_runsteps(page.data)
+            if len(page.data) < self.page_size:
+                break
+        return self.runsteps
+
+    def refresh(self, client=assistants_client):
+        """
+        Fetch messages and run steps created since the previous refresh.
+        """
+        return self.refresh_messages(client), self.refresh_runsteps(client)
+
+    async def async_refresh_messages(self, client=async_assistants_client):
+        while True:
+            page = await client.beta.threads.messages.list(**self._message_args())
+            self.add_messages(page.data)
+            if len(page.data) < self.page_size:
+                break
+        return self.messages
+
+    async def async_refresh_runsteps(self, client=async_assistants_client):
+        while True:
+            page = await client.beta.threads.runs.steps.list(**self._runstep_args())
+            self.add_runsteps(page.data)
+            if len(page.data) < self.page_size:
+                break
+        return self.runsteps
@@ -0,0 +1,164 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUEUE_NAME = "runs_queue"
+CONSUMER_WORKERS = int(os.getenv("CONSUMER_WORKERS", str(os.cpu_count() or 1)))
+# seconds between per-worker throughput reports
+REPORT_INTERVAL = float(os.getenv("SUPERVISOR_REPORT_INTERVAL", "30"))
+# seconds a draining worker gets to finish its in-flight runs before SIGKILL
+DRAIN_TIMEOUT = float(os.getenv("SUPERVISOR_DRAIN_TIMEOUT", "300"))
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+# a worker that stayed up this long is considered healthy, its backoff resets
+HEALTHY_UPTIME = 60.0
+
+
+def run_worker(worker_id: int, queue_name: str, succeeded, failed):
+    """
+    Entry point of a consumer worker process. Each worker opens its own
+    broker connection and channel and drains in-flight runs on SIGTERM.
+    """
+    # imported here so the supervisor itself never builds clients or models
+    from consumer import (
+        CONSUMER_MODE,
+        AsyncRabbitMQConsumer,
+        RabbitMQConsumer,
+    )
+
+    def on_processed(success: bool):
+        counter = succeeded if success else failed
+        with counter.get_lock():
+            counter.value += 1
+
+    # the supervisor handles CTRL+C for the whole group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    print(f"Worker {worker_id} started (pid={os.getpid()})")
+
+    if CONSUMER_MODE == "threaded":
+        consumer = RabbitMQConsumer(on_processed=on_processed)
+        signal.signal(signal.SIGTERM, lambda *_: consumer.stop())
+        consumer.start_consuming(queue_name)
+        return
+
+    async def main():
+        consumer = AsyncRabbitMQConsumer(on_processed=on_processed)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, consumer.stop)
+        await consumer.start_consuming(queue_name)
+
+    asyncio.run(main())
+    print(f"Worker {worker_id} drained and exited")
+
+
+class WorkerSlot:
+    def __init__(self, worker_id: int, context):
+        self.worker_id = worker_id
+        self.process: multiprocessing.Process = None
+        self.succeeded = context.Value("L", 0)
+        self.failed = context.Value("L", 0)
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = RESTART_BACKOFF_MIN
+        self.restart_at = 0.0
+        # counter values at the previous report, for per-interval rates
+        self.reported = 0
+
+
+class ConsumerSupervisor:
+    def __init__(self, workers: int = CONSUMER_WORKERS, queue_name: str = QUEUE_NAME):
+        """
+        Keeps `workers` consumer processes alive, restarting dead ones with
+        exponential backoff, and periodically reports their throughput.
+        """
+        # spawn instead of fork: the run executor builds HTTP clients at
+        # import time and those must not be shared across processes
+        self.context = multiprocessing.get_context("spawn")
+        self.queue_name = queue_name
+        self.slots = [WorkerSlot(i, self.context) for i in range(workers)]
+        self.shutting_down = False
+
+    def start_worker(self, slot: WorkerSlot):
+        slot.process = self.context.Process(
+            target=run_worker,
+            args=(slot.worker_id, self.queue_name, slot.succeeded, slot.failed),
+            name=f"consumer-{slot.worker_id}",
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+
+    def check_workers(self):
+        now = time.monotonic()
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                continue
+            if slot.process is not None:
+                uptime = now - slot.started_at
+                if uptime >= HEALTHY_UPTIME:
+                    slot.backoff = RESTART_BACKOFF_MIN
+                print(
+                    f"Worker {slot.worker_id} exited with code "
+                    f"{slot.process.exitcode} after {uptime:.0f}s, "
+                    f"restarting in {slot.backoff:.0f}s"
+                )
+                slot.process = None
+                slot.restart_at = now + slot.backoff
+                slot.backoff = min(slot.backoff * 2, RESTART_BACKOFF_MAX)
+                slot.restarts += 1
+            if now >= slot.restart_at:
+                self.start_worker(slot)
+
+    def report(self, interval: float):
+        lines = []
+        for slot in self.slots:
+            succeeded = slot.succeeded.value
+            failed = slot.failed.value
+            total = succeeded + failed
+            rate = (total - slot.reported) / interval if interval > 0 else 0.0
+            slot.reported = total
+            lines.append(
+                f"  worker {slot.worker_id}: {rate:.2f} runs/s, "
+                f"{succeeded} ok, {failed} failed, {slot.restarts} restarts"
+            )
+        print("Consumer throughput:\n" + "\n".join(lines))
+
+    def shutdown(self, *_):
+        self.shutting_down = True
+
+    def drain(self):
+        print("Draining workers")
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        for slot in self.slots:
+            if slot.process is None:
+                continue
+            slot.process.join(max(0.0, deadline - time.monotonic()))
+            if slot.process.is_alive():
+                print(f"Worker {slot.worker_id} did not drain in time, killing")
+                slot.process.kill()
+                slot.process.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.shutdown)
+        signal.signal(signal.SIGINT, self.shutdown)
+        print(f"Starting {len(self.slots)} consumer workers on {self.queue_name}")
+        last_report = time.monotonic()
+        while not self.shutting_down:
+            self.check_workers()
+            now = time.monotonic()
+            if now - last_report >= REPORT_INTERVAL:
+                self.report(now - last_report)
+                last_report = now
+            time.sleep(1)
+        self.drain()
+        self.report(time.monotonic() - last_report)
+
+
+if __name__ == "__main__":
+    ConsumerSupervisor().run()
@@ -1,4 +1,8 @@
-from typing import Literal
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Literal, Optional, Tuple
+import tiktoken
 from openai.pagination import SyncCursorPage
 from data_models import run
 from openai.types.beta.threads import ThreadMessage
@@ -6,6 +10,32 @@ from openai.types.beta.threads.runs import RetrievalToolCall
 from utils.tools import Actions
 from utils.tools import ActionItem
 
+# tokens the trace may use before the oldest observations get truncated
+TRACE_TOKEN_BUDGET = int(os.getenv("TRACE_TOKEN_BUDGET", "3000"))
+# tokens kept of an observation once it has been truncated
+TRUNCATED_OBSERVATION_TOKENS = 64
+# run steps whose rendered lines are kept between CoALA instances
+RENDERED_STEPS_CACHE_SIZE = 4096
+
+encoding = tiktoken.get_encoding("cl100k_base")
+
+# step id -> [(line, token count, is observation)]
+TraceLines = List[Tuple[str, int, bool]]
+_rendered_steps: OrderedDict[str, TraceLines] = OrderedDict()
+_rendered_steps_lock = threading.Lock()
+
+
+def render_line(line: str, is_observation: bool = False) -> Tuple[str, int, bool]:
+    return (line, len(encoding.encode(line)), is_observation)
+
+
+def truncate_line(line: str) -> Tuple[str, int, bool]:
+    tokens = encoding.encode(line)
+    if len(tokens) <= TRUNCATED_OBSERVATION_TOKENS:
+        return (line, len(tokens), True)
+    truncated = encoding.decode(tokens[:TRUNCATED_OBSERVATION_TOKENS])
+    return render_line(f"{truncated} ...[truncated]", True)
+
 
 class CoALA:
     def __init__(
@@ -27,27 +57,74 @@ class CoALA:
         self.job_summary = job_summary
         self.tools_map = tools_map
 
-    def compose_trace(self):
+    def render_step(
+        self, step: run.RunStep, message_index: dict[str, ThreadMessage]
+    ) -> TraceLines:
         """
-        Compose the trace prompt of the current task
+        Render the trace lines of a run step, reusing lines rendered for the
+        same step by earlier CoALA instances
         """
-        trace_prompt = []
-        for step in self.runsteps:
-            if step.type == "tool_calls":
-                trace_prompt.append(f"Action: {step.step_details.tool_calls[0].type}")
-                trace_prompt.append(
-                    f"Observation: {step.step_details.tool_calls[0].model_dump()}"
-                )
-            if step.type == "message_creation":
-                message = next(
-                    (
-                        msg.content[0].text.value
-                        for msg in self.messages.data
-                        if msg.id == step.step_details.message_creation.message_id
-                    ),
-                    None,
+        with _rendered_steps_lock:
+            lines = _rendered_steps.get(step.id)
+            if lines is not None:
+                _rendered_steps.move_to_end(step.id)
+                return lines
+
+        lines = []
+        cacheable = True
+        if step.type == "tool_calls":
+            lines.append(render_line(f"Action: {step.step_details.tool_calls[0].type}"))
+            lines.append(
+                render_line(
+                    f"Observation: {step.step_details.tool_calls[0].model_dump()}",
+                    is_observation=True,
                 )
-                trace_prompt.append(f"Thought: {message}")
+            )
+        if step.type == "message_creation":
+            message = message_index.get(step.step_details.message_creation.message_id)
+            # the message may not have been fetched yet, render it again later
+            cacheable = message is not None
+            text = message.content[0].text.value if message is not None else None
+            lines.append(render_line(f"Thought: {text}"))
+
+        if cacheable:
+            with _rendered_steps_lock:
+                _rendered_steps[step.id] = lines
+                while len(_rendered_steps) > RENDERED_STEPS_CACHE_SIZE:
+                    _rendered_steps.popitem(last=False)
+        return lines
+
+    def compose_trace(self, token_budget: Optional[int] = None):
+        """
+        Compose the trace prompt of the current task. When the trace exceeds
+        `token_budget` the oldest observations are truncated first, then the
+        oldest steps are omitted.
+        """
+        token_budget = token_budget or TRACE_TOKEN_BUDGET
+        message_index = {msg.id: msg for msg in self.messages.data}
+        # .data works for both sync and async (AsyncExecuteRun) pages
+        steps = [
+            list(self.render_step(step, message_index))
+            for step in self.runsteps.data
+        ]
+        total = sum(tokens for lines in steps for _, tokens, _ in lines)
+
+        for lines in steps:
+            if total <= token_budget:
+                break
+            for i, (line, tokens, is_observation) in enumerate(lines):
+                if is_observation:
+                    lines[i] = truncate_line(line)
+                    total -= tokens - lines[i][1]
+
+        omitted = 0
+        while total > token_budget and len(steps) > 1:
+            total -= sum(tokens for _, tokens, _ in steps.pop(0))
+            omitted += 1
+
+        trace_prompt = [line for lines in steps for line, _, _ in lines]
+        if omitted:
+            trace_prompt.insert(0, f"({omitted} earlier steps omitted)")
         return "\n".join(trace_prompt)
 
     def compose_actions(self):
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import random
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Connections kept alive per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "50"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+# base delay in seconds, doubled on every attempt and jittered
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+
+RETRY_STATUSES = (429, 502, 503, 504)
+TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def build_session(idempotent_post: bool = False) -> requests.Session:
+    """
+    Session with a keep-alive connection pool and jittered retries.
+    Connection failures are always retried since nothing reached the server.
+    Read errors and retryable statuses are only retried for POSTs when
+    `idempotent_post` is set, so run steps are never created twice.
+    """
+    allowed_methods = Retry.DEFAULT_ALLOWED_METHODS
+    if idempotent_post:
+        allowed_methods = allowed_methods | {"POST"}
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=allowed_methods,
+        backoff_factor=HTTP_BACKOFF,
+        backoff_jitter=HTTP_BACKOFF,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# shared across every run executed by this process
+ops_session = build_session()
+idempotent_ops_session = build_session(idempotent_post=True)
+
+# created lazily so it binds to the event loop of the consumer that uses it
+_async_http_client: httpx.AsyncClient = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _async_http_client
+
+
+def backoff_delay(attempt: int) -> float:
+    return HTTP_BACKOFF * (2**attempt) + random.uniform(0, HTTP_BACKOFF)
+
+
+async def async_post(url: str, json: dict, idempotent: bool = False) -> httpx.Response:
+    """
+    POST through the shared async client with the same retry policy as
+    build_session.
+    """
+    client = get_async_http_client()
+    attempt = 0
+    while True:
+        try:
+            response = await client.post(url, json=json)
+            if (
+                not idempotent
+                or response.status_code not in RETRY_STATUSES
+                or attempt >= HTTP_RETRIES
+            ):
+                return response
+        except httpx.ConnectError:
+            if attempt >= HTTP_RETRIES:
+                raise
+        except httpx.TransportError:
+            if not idempotent or attempt >= HTTP_RETRIES:
+                raise
+        await asyncio.sleep(backoff_delay(attempt))
+        attempt += 1
@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from openai.types.beta import Assistant
+from openai.types import FileObject
+from utils.openai_clients import assistants_client
+
+load_dotenv()
+
+# seconds an assistant is served from cache, its file_ids can change
+ASSISTANT_CACHE_TTL = float(os.getenv("ASSISTANT_CACHE_TTL", "30"))
+# seconds a file's metadata is served from cache, files are immutable
+FILE_CACHE_TTL = float(os.getenv("FILE_CACHE_TTL", "3600"))
+# concurrent files.retrieve calls on a cache miss
+FILE_FETCH_CONCURRENCY = 16
+
+
+class MetadataCache:
+    def __init__(
+        self,
+        assistant_ttl: float = ASSISTANT_CACHE_TTL,
+        file_ttl: float = FILE_CACHE_TTL,
+    ):
+        """
+        Process-wide TTL cache of assistants and file metadata shared by the
+        runs of a consumer. Assistants fetched by the run executor are put
+        here so actions of the same run never retrieve them again.
+        """
+        self.assistant_ttl = assistant_ttl
+        self.file_ttl = file_ttl
+        self.assistants: Dict[str, tuple[float, Assistant]] = {}
+        self.files: Dict[str, tuple[float, FileObject]] = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=FILE_FETCH_CONCURRENCY)
+
+    def put_assistant(self, assistant: Assistant):
+        with self.lock:
+            self.assistants[assistant.id] = (time.monotonic(), assistant)
+
+    def get_assistant(self, assistant_id: str) -> Assistant:
+        with self.lock:
+            entry = self.assistants.get(assistant_id)
+        if entry is not None and time.monotonic() - entry[0] < self.assistant_ttl:
+            return entry[1]
+        assistant = assistants_client.beta.assistants.retrieve(
+            assistant_id=assistant_id,
+        )
+        self.put_assistant(assistant)
+        return assistant
+
+    def _cached_file(self, file_id: str) -> Optional[FileObject]:
+        entry = self.files.get(file_id)
+        if entry is not None and time.monotonic() - entry[0] < self.file_ttl:
+            return entry[1]
+        return None
+
+    def get_files(self, file_ids: List[str]) -> List[FileObject]:
+        """
+        Return file metadata in the order of `file_ids`, fetching only the
+        missing or expired entries, concurrently.
+        """
+        with self.lock:
+            cached = {file_id: self._cached_file(file_id) for file_id in file_ids}
+        missing = [file_id for file_id, file in cached.items() if file is None]
+        if missing:
+            fetched = list(self.executor.map(assistants_client.files.retrieve, missing))
+            now = time.monotonic()
+            with self.lock:
+                for file in fetched:
+                    self.files[file.id] = (now, file)
+                    cached[file.id] = file
+        return [cached[file_id] for file_id in file_ids]
+
+
+metadata_cache = MetadataCache()
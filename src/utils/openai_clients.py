@@ -1,4 +1,4 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, AzureOpenAI, OpenAI
 import os
 from dotenv import load_dotenv
 
@@ -17,4 +17,26 @@ else:
 
 assistants_client = OpenAI(
     base_url=os.getenv("ASSISTANTS_API_URL"),
-)
\ No newline at end of file
+)
+
+# used by AsyncExecuteRun to issue independent reads concurrently
+async_assistants_client = AsyncOpenAI(
+    base_url=os.getenv("ASSISTANTS_API_URL"),
+)
+
+# used by the vectordb ADAEmbedder, configured like the text2vec-openai module
+# in vectordb/schema/schema_generator.py so documents and queries share a model
+if os.getenv("OPENAI_API_TYPE") == "azure":
+    embeddings_client = AzureOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        azure_endpoint=f"https://{os.getenv('AZURE_OPENAI_RESOURCE_NAME')}.openai.azure.com",
+        api_version=os.getenv("OPENAI_API_VERSION", "2023-05-15"),
+    )
+    # Azure routes requests by deployment, passed as the model
+    OPENAI_EMBEDDING_MODEL = os.getenv("AZURE_OPENAI_EMBEDDING_MODEL")
+else:
+    embeddings_client = OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL", None),
+    )
+    OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
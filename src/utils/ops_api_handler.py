@@ -1,18 +1,28 @@
 # api_handler.py
-from typing import List, Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Optional
 from openai import OpenAI
-import requests
 import os
 from dotenv import load_dotenv
+from pydantic import BaseModel
 from data_models import run
+from data_models.run import Run
 from openai.types.beta.threads import ThreadMessage
 from openai.types.beta.threads.runs import RetrievalToolCall
 from openai.types.beta.threads.runs.web_retrieval_tool_call import WebRetrievalToolCall
 from utils.openai_clients import assistants_client
+from utils.http_clients import (
+    TIMEOUT,
+    async_post,
+    idempotent_ops_session,
+    ops_session,
+)
 
 # TODO: create run script that imports env vars
 load_dotenv()
 BASE_URL = os.getenv("ASSISTANTS_API_URL")
+# set when the ops API exposes the /batch endpoint used by OpsBatch.flush
+OPS_API_BATCH = os.getenv("OPS_API_BATCH", "false").lower() in ("1", "true")
 
 
 def update_run(thread_id: str, run_id: str, run_update: run.RunUpdate) -> run.Run:
@@ -30,7 +40,25 @@ def update_run(thread_id: str, run_id: str, run_update: run.RunUpdate) -> run.Ru
     update_url = f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}"
     update_data = run_update.model_dump(exclude_none=True)
 
-    response = requests.post(update_url, json=update_data)
+    # setting the run state twice is harmless, so this request may be retried
+    response = idempotent_ops_session.post(update_url, json=update_data, timeout=TIMEOUT)
+
+    if response.status_code == 200:
+        return run.Run(**response.json())
+    else:
+        return None
+
+
+async def async_update_run(
+    thread_id: str, run_id: str, run_update: run.RunUpdate
+) -> run.Run:
+    """
+    Async variant of update_run, see update_run for parameters.
+    """
+    update_url = f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}"
+    update_data = run_update.model_dump(exclude_none=True)
+
+    response = await async_post(update_url, update_data, idempotent=True)
 
     if response.status_code == 200:
         return run.Run(**response.json())
@@ -50,27 +78,25 @@ def create_message(
     return message
 
 
-def create_message_runstep(
-    thread_id: str, run_id: str, assistant_id: str, content: str
-) -> run.RunStep:
-    message = create_message(thread_id, content, role="assistant")
-    # Prepare run step details
+def message_runstep_details(assistant_id: str, message_id: str) -> dict:
     run_step_details = {
         "assistant_id": assistant_id,
         "step_details": {
             "type": "message_creation",
-            "message_creation": {"message_id": message.id},
+            "message_creation": {"message_id": message_id},
         },
         "type": "message_creation",
         "status": "completed",
     }
-    run_step_details = run.RunStepCreate(**run_step_details).model_dump(
-        exclude_none=True
-    )
+    return run.RunStepCreate(**run_step_details).model_dump(exclude_none=True)
+
 
+def post_runstep(thread_id: str, run_id: str, run_step_details: dict) -> run.RunStep:
     # Post request to create a run step
-    response = requests.post(
-        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps", json=run_step_details
+    response = ops_session.post(
+        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps",
+        json=run_step_details,
+        timeout=TIMEOUT,
     )
     if response.status_code != 200:
         raise Exception(f"Failed to create run step: {response.text}")
@@ -78,6 +104,40 @@ def create_message_runstep(
     return run.RunStep(**response.json())
 
 
+def create_message_runstep(
+    thread_id: str, run_id: str, assistant_id: str, content: str
+) -> run.RunStep:
+    message = create_message(thread_id, content, role="assistant")
+    return post_runstep(
+        thread_id, run_id, message_runstep_details(assistant_id, message.id)
+    )
+
+
+def post_message_delta(thread_id: str, run_id: str, text: str) -> bool:
+    """
+    Push a partial assistant message of a run to the ops API so clients can
+    render it before the message is created. Best effort, returns False
+    instead of raising when the delta could not be delivered.
+    """
+    delta = {
+        "object": "thread.message.delta",
+        "delta": {
+            "role": "assistant",
+            "content": [{"type": "text", "text": {"value": text}}],
+        },
+    }
+    try:
+        response = ops_session.post(
+            f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/message_deltas",
+            json=delta,
+            timeout=TIMEOUT,
+        )
+    except Exception as e:
+        print(f"Failed to push message delta: {e}")
+        return False
+    return response.status_code == 200
+
+
 def create_retrieval_runstep(
     thread_id: str, run_id: str, assistant_id: str, documents: List[str]
 ) -> dict:
@@ -105,8 +165,10 @@ def create_retrieval_runstep(
     )
 
     # Post request to create a run step
-    response = requests.post(
-        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps", json=run_step_details
+    response = ops_session.post(
+        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps",
+        json=run_step_details,
+        timeout=TIMEOUT,
     )
     if response.status_code != 200:
         raise Exception(f"Failed to create run step: {response.text}")
@@ -141,10 +203,146 @@ def create_web_retrieval_runstep(
     )
 
     # Post request to create a run step
-    response = requests.post(
-        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps", json=run_step_details
+    response = ops_session.post(
+        f"{BASE_URL}/ops/threads/{thread_id}/runs/{run_id}/steps",
+        json=run_step_details,
+        timeout=TIMEOUT,
     )
     if response.status_code != 200:
         raise Exception(f"Failed to create run step: {response.text}")
 
     return run.RunStep(**response.json())
+
+
+# shared by every OpsBatch in the process
+_batch_executor = ThreadPoolExecutor(max_workers=16)
+_batch_endpoint_supported = OPS_API_BATCH
+
+
+# statuses after which a client stops polling a run and reads its steps
+TERMINAL_RUN_STATUSES = {
+    run.RunStatus.REQUIRES_ACTION.value,
+    run.RunStatus.CANCELLED.value,
+    run.RunStatus.FAILED.value,
+    run.RunStatus.COMPLETED.value,
+    run.RunStatus.EXPIRED.value,
+}
+
+
+class OpsBatchResult(BaseModel):
+    runsteps: List[run.RunStep] = []
+    # the field shadows the run module in the class body, so the type is imported by name
+    run: Optional[Run] = None
+
+
+class OpsBatch:
+    def __init__(self, thread_id: str, run_id: str, assistant_id: str):
+        """
+        Collects the messages, run steps and run update produced by one step
+        of a run and commits them together. With OPS_API_BATCH set they are
+        sent in a single request, otherwise a non-terminal run update is sent
+        concurrently with the message and run step writes and a terminal one
+        only after they succeeded.
+        """
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.assistant_id = assistant_id
+        # (content, None) for message runsteps, (None, details) for tool calls
+        self.pending_runsteps: List[tuple[Optional[str], Optional[dict]]] = []
+        self.run_update: Optional[run.RunUpdate] = None
+
+    def add_message_runstep(self, content: str) -> "OpsBatch":
+        self.pending_runsteps.append((content, None))
+        return self
+
+    def add_runstep(self, run_step_details: dict) -> "OpsBatch":
+        self.pending_runsteps.append((None, run_step_details))
+        return self
+
+    def set_run_update(self, run_update: run.RunUpdate) -> "OpsBatch":
+        self.run_update = run_update
+        return self
+
+    def flush(self) -> OpsBatchResult:
+        global _batch_endpoint_supported
+        if _batch_endpoint_supported:
+            result = self._flush_batch_request()
+            if result is not None:
+                return result
+            print("Ops API has no batch endpoint, falling back to pipelining")
+            _batch_endpoint_supported = False
+        return self._flush_pipelined()
+
+    def _flush_batch_request(self) -> Optional[OpsBatchResult]:
+        operations = []
+        for content, run_step_details in self.pending_runsteps:
+            if content is not None:
+                operations.append(
+                    {
+                        "type": "message_runstep",
+                        "assistant_id": self.assistant_id,
+                        "content": content,
+                    }
+                )
+            else:
+                operations.append({"type": "runstep", "runstep": run_step_details})
+        if self.run_update is not None:
+            operations.append(
+                {
+                    "type": "run_update",
+                    "run": self.run_update.model_dump(exclude_none=True),
+                }
+            )
+        response = ops_session.post(
+            f"{BASE_URL}/ops/threads/{self.thread_id}/runs/{self.run_id}/batch",
+            json={"operations": operations},
+            timeout=TIMEOUT,
+        )
+        if response.status_code in (404, 405):
+            return None
+        if response.status_code != 200:
+            raise Exception(f"Failed to flush ops batch: {response.text}")
+        return OpsBatchResult(**response.json())
+
+    def _create_runsteps(self) -> List[run.RunStep]:
+        # sequential so messages and steps keep their order in the thread
+        runsteps = []
+        for content, run_step_details in self.pending_runsteps:
+            if content is not None:
+                message = create_message(self.thread_id, content, role="assistant")
+                run_step_details = message_runstep_details(
+                    self.assistant_id, message.id
+                )
+            runsteps.append(post_runstep(self.thread_id, self.run_id, run_step_details))
+        return runsteps
+
+    def _flush_pipelined(self) -> OpsBatchResult:
+        terminal = (
+            self.run_update is not None
+            and self.run_update.status in TERMINAL_RUN_STATUSES
+        )
+        run_future = None
+        if self.run_update is not None and not terminal:
+            run_future = _batch_executor.submit(
+                update_run, self.thread_id, self.run_id, self.run_update
+            )
+        try:
+            runsteps = self._create_runsteps()
+        except Exception as e:
+            if terminal:
+                # the run must not end without the steps a client polls for
+                update_run(
+                    self.thread_id,
+                    self.run_id,
+                    run.RunUpdate(
+                        status=run.RunStatus.FAILED.value,
+                        last_error={"code": "server_error", "message": str(e)},
+                    ),
+                )
+            raise
+        if terminal:
+            # a client polling the run only sees it end once its steps exist
+            updated_run = update_run(self.thread_id, self.run_id, self.run_update)
+        else:
+            updated_run = run_future.result() if run_future is not None else None
+        return OpsBatchResult(runsteps=runsteps, run=updated_run)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from utils.openai_clients import litellm_client
+
+load_dotenv()
+
+# entries kept in the in-memory tier
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+# seconds before a cached response is regenerated, 0 disables expiry
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+# SQLite file for the on-disk tier, unset keeps the cache in memory only
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH")
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_size: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        path: Optional[str] = RESPONSE_CACHE_PATH,
+    ):
+        """
+        Content-addressed cache of chat completion responses with an
+        in-memory LRU tier and an optional SQLite tier shared between
+        processes.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self.db: Optional[sqlite3.Connection] = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, created_at REAL, content TEXT)"
+            )
+            self.db.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        normalized = [
+            {"role": message["role"], "content": message["content"].strip()}
+            for message in messages
+        ]
+        payload = json.dumps(
+            {"model": model, "messages": normalized, "max_tokens": max_tokens},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and not self.expired(entry[0]):
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT created_at, content FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self.expired(row[0]):
+                    self._remember(key, row[0], row[1])
+                    self.stats["disk_hits"] += 1
+                    return row[1]
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, content: str):
+        created_at = time.time()
+        with self.lock:
+            self._remember(key, created_at, content)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, created_at, content),
+                )
+                self.db.commit()
+
+    def _remember(self, key: str, created_at: float, content: str):
+        self.entries[key] = (created_at, content)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def create_completion(
+        self, model: str, messages: List[Dict[str, str]], max_tokens: int
+    ) -> str:
+        """
+        Return the content of a chat completion, calling the LLM only when
+        the same model, messages and max_tokens were not seen before.
+        """
+        key = self.make_key(model, messages, max_tokens)
+        content = self.get(key)
+        if content is not None:
+            return content
+        response = litellm_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+        )
+        content = response.choices[0].message.content
+        self.set(key, content)
+        return content
+
+
+# shared by the agents of every run in the process
+response_cache = ResponseCache()
@@ -0,0 +1,153 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from utils.openai_clients import litellm_client
+from utils.ops_api_handler import post_message_delta
+
+load_dotenv()
+
+# stream final answers and thoughts to the ops API while they are generated
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "false").lower() in ("1", "true")
+
+
+class SectionStreamParser:
+    def __init__(self, start_marker: str, end_marker: Optional[str] = None):
+        """
+        Incrementally extracts the text between `start_marker` and
+        `end_marker` (or the end of the stream) from streamed chunks.
+        Text that could still be the beginning of a marker split across
+        chunks is held back until the next chunk arrives.
+        """
+        self.start_marker = start_marker
+        self.end_marker = end_marker
+        self.started = False
+        self.finished = False
+        self.pending = ""
+        self.raw: List[str] = []
+        self.section: List[str] = []
+
+    def feed(self, text: str) -> str:
+        """
+        Consume a chunk and return the new section text it completes.
+        """
+        self.raw.append(text)
+        if self.finished:
+            return ""
+        self.pending += text
+        if not self.started:
+            index = self.pending.find(self.start_marker)
+            if index == -1:
+                keep = len(self.start_marker) - 1
+                self.pending = self.pending[-keep:] if keep else ""
+                return ""
+            self.started = True
+            self.pending = self.pending[index + len(self.start_marker) :]
+
+        if self.end_marker:
+            index = self.pending.find(self.end_marker)
+            if index != -1:
+                emitted = self.pending[:index]
+                self.pending = ""
+                self.finished = True
+            else:
+                cut = max(0, len(self.pending) - (len(self.end_marker) - 1))
+                emitted = self.pending[:cut]
+                self.pending = self.pending[cut:]
+        else:
+            emitted = self.pending
+            self.pending = ""
+        self.section.append(emitted)
+        return emitted
+
+    def finish(self) -> str:
+        """
+        Flush the held back text once the stream has ended.
+        """
+        if not self.started or self.finished:
+            return ""
+        emitted = self.pending
+        self.pending = ""
+        self.finished = True
+        self.section.append(emitted)
+        return emitted
+
+    @property
+    def content(self) -> str:
+        # without a start marker the whole generation is the answer
+        if not self.started:
+            return "".join(self.raw)
+        return "".join(self.section)
+
+
+class DeltaPublisher:
+    def __init__(self, thread_id: str, run_id: str):
+        """
+        Sends message deltas in order from a background thread so the token
+        stream is never blocked on the ops API. Chunks that arrive while a
+        delta is in flight are coalesced into the next one.
+        """
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.pending = ""
+        self.in_flight = False
+
+    def push(self, text: str):
+        if not text:
+            return
+        with self.lock:
+            self.pending += text
+            if self.in_flight:
+                return
+            self.in_flight = True
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                text, self.pending = self.pending, ""
+                if not text:
+                    self.in_flight = False
+                    return
+            post_message_delta(self.thread_id, self.run_id, text)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def stream_section(
+    thread_id: str,
+    run_id: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    start_marker: str,
+    end_marker: Optional[str] = None,
+) -> str:
+    """
+    Stream a completion, publish the text of the marked section as message
+    deltas while it arrives and return the complete section.
+    """
+    parser = SectionStreamParser(start_marker, end_marker)
+    publisher = DeltaPublisher(thread_id, run_id)
+    stream = litellm_client.chat.completions.create(
+        model=os.getenv("LITELLM_MODEL"),
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            publisher.push(parser.feed(chunk.choices[0].delta.content))
+            if parser.finished:
+                # nothing after the end marker is used, stop generating
+                break
+        publisher.push(parser.finish())
+    finally:
+        stream.response.close()
+        publisher.close()
+    return parser.content
@@ -102,6 +102,8 @@ class SentenceChunker(Chunker):
                     doc_type=document.doc_type or "document",
                     chunk_id=str(split_id_counter) or str(0)
                 )
+                doc_chunk.set_tokens(self.count_tokens(text))
+                doc_chunk.set_token_span(start_i, end_i)
                 document.chunks.append(doc_chunk)
                 split_id_counter += 1
 
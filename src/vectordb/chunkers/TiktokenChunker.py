@@ -2,13 +2,13 @@
 Tiktoken Token Chunker. Based on Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
-import tiktoken
 from tqdm import tqdm
 from loguru import logger
 from typing_extensions import List
 
-from src.vectordb.chunkers.interface import Chunker
-from src.vectordb.chunkers.chunk import Document, Chunk
+from src.vectordb.chunkers.interface import Chunker, encoding
+from src.vectordb.readers.document import Document
+from src.vectordb.chunkers.chunk import Chunk
 
 
 class TokenChunker(Chunker):
@@ -44,7 +44,7 @@ class TokenChunker(Chunker):
         self.default_units = 250
         self.default_overlap = 50
         self.description = "Chunk documents by tokens powered by tiktoken. You can specify how many tokens should overlap between chunks to improve retrieval."
-        self.encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        self.encoding = encoding
 
     def chunk(
         self, documents: List[Document], units: int, overlap: int
@@ -71,6 +71,7 @@ class TokenChunker(Chunker):
             If the overlap is greater than or equal to the units, a warning is logged and the function continues to the next document.
             The function then iterates over the encoded tokens, creating chunks of the specified units and overlapping them by the specified overlap.
             Each chunk is created by decoding the corresponding tokens using the tiktoken encoding and creating a Chunk object with the decoded text, document name, document type, and a unique chunk ID.
+            The token count and token offsets of each chunk are recorded on it, so they never need to be encoded again.
             The function then appends the Chunk object to the Document object's List of chunks.
             The function returns the List of Document objects with their chunks added.
         """
@@ -113,6 +114,8 @@ class TokenChunker(Chunker):
                     doc_type=document.type,
                     chunk_id=str(split_id_counter),
                 )
+                doc_chunk.set_tokens(len(chunk_tokens))
+                doc_chunk.set_token_span(start_i, end_i)
                 document.chunks.append(doc_chunk)
                 split_id_counter += 1
 
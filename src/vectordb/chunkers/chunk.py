@@ -2,11 +2,28 @@
 Chunk. Based off of Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
+import hashlib
 from typing_extensions import Dict
 
+import numpy as np
+
 
 class Chunk:
     "Chunk class that represents a chunk of text."
+    # Slotted, a corpus holds millions of chunks and a per-instance __dict__ dominates their footprint
+    __slots__ = (
+        "_text",
+        "_doc_name",
+        "_doc_type",
+        "_doc_uuid",
+        "_chunk_id",
+        "_no_overlap_span",
+        "_tokens",
+        "_token_span",
+        "_vector",
+        "_score",
+    )
+
     def __init__(
         self,
         text: str = "",
@@ -30,8 +47,9 @@ class Chunk:
         self._doc_type = doc_type
         self._doc_uuid = doc_uuid
         self._chunk_id = chunk_id
-        self._text_no_overlap = text
+        self._no_overlap_span = None
         self._tokens = 0
+        self._token_span = None
         self._vector = None
         self._score = 0
 
@@ -48,12 +66,16 @@ class Chunk:
     @property
     def text_no_overlap(self):
         """
-        Returns the value of the `_text_no_overlap` attribute.
+        Returns the text of the chunk without the overlap, sliced from `_text` by the
+        `_no_overlap_span` offsets so the text is not stored twice.
 
-        :return: The value of the `_text_no_overlap` attribute.
+        :return: The text of the chunk without the overlap.
         :rtype: str
         """
-        return self._text_no_overlap
+        if self._no_overlap_span is None:
+            return self._text
+        start, end = self._no_overlap_span
+        return self._text[start:end]
 
     @property
     def doc_name(self):
@@ -102,15 +124,33 @@ class Chunk:
         """
         return self._tokens
 
+    @property
+    def token_span(self):
+        """
+        Returns the value of the `_token_span` attribute, the (start, end) offsets of the chunk
+        in the units its chunker split the document into.
+        """
+        return self._token_span
+
     @property
     def vector(self):
         """
-        Returns the value of the `_vector` attribute.
+        Returns the value of the `_vector` attribute, a float32 array or None.
 
         :return: The value of the `_vector` attribute.
         """
         return self._vector
 
+    @property
+    def content_hash(self):
+        """
+        Returns the sha256 hex digest of the chunk text.
+
+        :return: The sha256 hex digest of the `_text` attribute.
+        :rtype: str
+        """
+        return hashlib.sha256(self._text.encode("utf-8")).hexdigest()
+
     @property
     def score(self):
         """
@@ -135,27 +175,54 @@ class Chunk:
 
     def set_tokens(self, token):
         """
-        Sets the value of the `_tokens` attribute.
+        Sets the value of the `_tokens` attribute, the tiktoken count of the chunk text.
 
         Parameters:
-            token (any): The token to set.
+            token (int): The token count to set.
 
         Returns:
             None
         """
         self._tokens = token
 
+    def set_token_span(self, start, end):
+        """
+        Sets the value of the `_token_span` attribute.
+
+        Parameters:
+            start (int): The offset of the first unit of the chunk in its document.
+            end (int): The offset after the last unit of the chunk in its document.
+
+        Returns:
+            None
+        """
+        self._token_span = (start, end)
+
+    def set_text_no_overlap(self, start, end):
+        """
+        Sets the part of the chunk text that does not overlap the previous and next chunks.
+
+        Parameters:
+            start (int): The character offset in the chunk text where the non-overlapping text starts.
+            end (int): The character offset in the chunk text where the non-overlapping text ends.
+
+        Returns:
+            None
+        """
+        self._no_overlap_span = None if (start, end) == (0, len(self._text)) else (start, end)
+
     def set_vector(self, vector):
         """
-        Set the vector attribute of the object.
+        Set the vector attribute of the object. The vector is stored as a float32 array,
+        float32 arrays such as the rows of Document.pack_vectors are kept without a copy.
 
         Args:
-            vector: The vector to set.
+            vector: The vector to set, None clears it.
 
         Returns:
             None
         """
-        self._vector = vector
+        self._vector = None if vector is None else np.asarray(vector, dtype=np.float32)
 
     def set_score(self, score):
         """
@@ -180,7 +247,9 @@ class Chunk:
             "doc_uuid": self.doc_uuid,
             "chunk_id": self.chunk_id,
             "tokens": self.tokens,
-            "vector": self.vector,
+            "token_span": self.token_span,
+            "no_overlap_span": self._no_overlap_span,
+            "vector": self.vector.tolist() if self.vector is not None else None,
             "score": self.score,
         }
 
@@ -195,6 +264,10 @@ class Chunk:
             chunk_id=data.get("chunk_id", ""),
         )
         chunk.set_tokens(data.get("tokens", 0))
+        if data.get("token_span"):
+            chunk.set_token_span(*data["token_span"])
+        if data.get("no_overlap_span"):
+            chunk.set_text_no_overlap(*data["no_overlap_span"])
         chunk.set_vector(data.get("vector"))
         chunk.set_score(data.get("score", 0))
         return chunk
\ No newline at end of file
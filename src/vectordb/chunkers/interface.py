@@ -1,8 +1,12 @@
+import tiktoken
 from typing_extensions import List
 from src.vectordb.readers.document import Document
 from src.vectordb.readers.interface import InputForm
 from src.vectordb.component import Component
 
+# Token counts recorded on chunks, the encoding the embedders and check_chunks budget with
+encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+
 class Chunker(Component):
     """
     Interface for Verba Chunking.
@@ -35,6 +39,18 @@ class Chunker(Component):
         self.default_units = 100
         self.default_overlap = 50
 
+    def count_tokens(self, text: str) -> int:
+        """
+        Returns the tiktoken count of a chunk text, recorded on the chunk when it is created.
+
+        Parameters:
+            text (str): The text of the chunk.
+
+        Returns:
+            int: The number of tokens of the text.
+        """
+        return len(encoding.encode(text, disallowed_special=()))
+
     def chunk(
         self, documents: List[Document], units: int, overlap: int
     ) -> List[Document]:
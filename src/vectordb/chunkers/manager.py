@@ -2,15 +2,73 @@
 Chunker Manager. Manager class that handles chunking classes. Based one Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
-import tiktoken
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
+from tqdm import tqdm
 from typing_extensions import List, Dict
 
+from src.vectordb.component import benchmark_startup, check_components, get_shared_component
 from src.vectordb.readers.document import Document
-from src.vectordb.chunkers.interface import Chunker
-from src.vectordb.chunkers.SentenceChunker import SentenceChunker
-from src.vectordb.chunkers.TiktokenChunker import TokenChunker
-from src.vectordb.chunkers.WordChunker import WordChunker
+from src.vectordb.chunkers.chunk import Chunk
+from src.vectordb.chunkers.interface import Chunker, encoding
+
+# Chunkers are imported and constructed on first use, see get_shared_component
+CHUNKERS: Dict[str, str] = {
+    "TokenChunker": "src.vectordb.chunkers.TiktokenChunker:TokenChunker",
+    "WordChunker": "src.vectordb.chunkers.WordChunker:WordChunker",
+    "SentenceChunker": "src.vectordb.chunkers.SentenceChunker:SentenceChunker",
+}
+
+# Processes chunking documents in parallel, 1 chunks in the calling process
+CHUNKER_WORKERS = int(os.getenv("CHUNKER_WORKERS", "1"))
+# Token count above which check_chunks reports a chunk
+MAX_CHUNK_TOKENS = 1000
+# Tasks per worker, more tasks balance uneven documents better at the cost of more pickling
+CHUNKER_TASKS_PER_WORKER = 4
+
+
+def init_chunk_worker():
+    """
+    Silences the progress bars of the chunkers in worker processes, the manager reports progress per shard.
+    """
+    os.environ["TQDM_DISABLE"] = "1"
+
+
+def chunk_shard(
+    chunker_path: str, documents: List[Document], units: int, overlap: int
+) -> List[List[Chunk]]:
+    """
+    Chunks a shard of documents in a worker process with the worker's shared chunker.
+
+    Returns:
+        List[List[Chunk]]: The chunks of every document of the shard, in order.
+    """
+    chunked = get_shared_component(chunker_path).chunk(documents, units, overlap)
+    return [document.chunks for document in chunked]
+
+
+def shard_documents(documents: List[Document], shards: int) -> List[List[Document]]:
+    """
+    Splits documents into contiguous shards of roughly equal text length, so every task does
+    a similar amount of work and concatenating the shards keeps the document order.
+    """
+    total = sum(len(document.text or "") for document in documents)
+    target = max(1, total // max(1, shards))
+    result = []
+    current = []
+    size = 0
+    for document in documents:
+        current.append(document)
+        size += len(document.text or "")
+        if size >= target:
+            result.append(current)
+            current = []
+            size = 0
+    if current:
+        result.append(current)
+    return result
 
 
 class ChunkerManager:
@@ -21,7 +79,7 @@ class ChunkerManager:
         """
         Initializes a new instance of the ChunkerManager class.
 
-        This method initializes the instance variables of the ChunkerManager class. It creates an empty List called `batch`, sets the `token_count` variable to 0, and creates an empty List called `batches`. It also creates a Dictionary called `chunker` with three key-value pairs, where the keys are strings representing the names of different chunking classes ("TokenChunker", "WordChunker", and "SentenceChunker"), and the values are instances of the corresponding chunking classes (`TokenChunker`, `WordChunker`, and `SentenceChunker`). The `selected_chunker` variable is then set to the instance of the `TokenChunker` class.
+        This method initializes the instance variables of the ChunkerManager class. It creates a Dictionary called `chunker` mapping the names of the chunking classes ("TokenChunker", "WordChunker", and "SentenceChunker") to their import paths, and selects "TokenChunker". Chunkers and their spacy pipelines are only constructed when selected or used, and are shared process-wide.
 
         Parameters:
             None
@@ -29,16 +87,15 @@ class ChunkerManager:
         Returns:
             None
         """
-        self.batch = []
-        self.token_count = 0
-        self.batches = []
+        self.chunker: Dict[str, str] = dict(CHUNKERS)
+        self.selected_chunker_name = "TokenChunker"
 
-        self.chunker: Dict[str, Chunker] = {
-            "TokenChunker": TokenChunker(),
-            "WordChunker": WordChunker(),
-            "SentenceChunker": SentenceChunker(),
-        }
-        self.selected_chunker: Chunker = self.chunker["TokenChunker"]
+    @property
+    def selected_chunker(self) -> Chunker:
+        """
+        The selected chunker, constructed on first use.
+        """
+        return get_shared_component(self.chunker[self.selected_chunker_name])
 
     def chunk(
         self, documents: List[Document], units: int, overlap: int
@@ -56,10 +113,50 @@ class ChunkerManager:
         Returns:
             List[Document]: A List of chunked documents if the chunked documents pass the check for the token count. Otherwise, an empty List.
         """
-        chunked_docs = self.selected_chunker.chunk(documents, units, overlap)
+        if CHUNKER_WORKERS > 1 and len(documents) > 1:
+            chunked_docs = self.parallel_chunk(documents, units, overlap, CHUNKER_WORKERS)
+        else:
+            chunked_docs = self.selected_chunker.chunk(documents, units, overlap)
         logger.info("Chunking completed")
         return chunked_docs if self.check_chunks(chunked_docs) else []
 
+    def parallel_chunk(
+        self, documents: List[Document], units: int, overlap: int, workers: int
+    ) -> List[Document]:
+        """
+        Chunk verba documents with the selected chunker across a pool of worker processes.
+
+        Documents are split into contiguous shards of similar text length, several per worker. Chunk ids are
+        assigned per document, so they are the same as with serial chunking, and the chunks of every shard are
+        put back on the original documents in order.
+
+        Parameters:
+            documents (List[Document]): A List of Verba documents to be chunked.
+            units (int): The number of units per chunk (words, sentences, etc.).
+            overlap (int): The amount of overlap between chunks.
+            workers (int): The number of worker processes.
+
+        Returns:
+            List[Document]: The chunked documents, in their original order.
+        """
+        chunker_path = self.chunker[self.selected_chunker_name]
+        shards = shard_documents(documents, workers * CHUNKER_TASKS_PER_WORKER)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_chunk_worker,
+        ) as executor:
+            futures = [
+                executor.submit(chunk_shard, chunker_path, shard, units, overlap)
+                for shard in shards
+            ]
+            for shard, future in tqdm(
+                zip(shards, futures), total=len(shards), desc="Chunking document shards"
+            ):
+                for document, chunks in zip(shard, future.result()):
+                    document.chunks = chunks
+        return documents
+
     def set_chunker(self, chunker: str) -> bool:
         """
         Set the selected chunker based on the given chunker name.
@@ -71,7 +168,8 @@ class ChunkerManager:
             bool: True if the chunker is found and set successfully, False otherwise.
         """
         if chunker in self.chunker:
-            self.selected_chunker = self.chunker[chunker]
+            self.selected_chunker_name = chunker
+            get_shared_component(self.chunker[chunker])
             return True
         else:
             logger.warning(f"Chunker {chunker} not found")
@@ -79,47 +177,47 @@ class ChunkerManager:
 
     def get_chunkers(self) -> Dict[str, Chunker]:
         """
-        Returns a Dictionary containing all the chunkers available.
+        Returns a Dictionary containing all the chunkers available. This constructs every chunker.
 
         :return: A Dictionary where the keys are the names of the chunkers and the values are the chunkers themselves.
         :return type: Dict[str, Chunker]
         """
-        return self.chunker
+        return {name: get_shared_component(path) for name, path in self.chunker.items()}
 
     def check_chunks(self, documents: List[Document]) -> int:
         """
         Checks the token count of chunks in a List of Verba documents.
 
-        This function takes a List of Verba documents as input and checks the token count of each chunk in the documents. It uses the selected chunker to encode the text of each chunk and calculates the token count. The function hardcaps the token count of each chunk to 1000 tokens.
+        This function takes a List of Verba documents as input and validates the token count of each chunk in a single pass. The chunkers record the token count of every chunk when it is created, only chunks without a count (e.g. chunked before they reached the manager) are encoded here. Chunks above MAX_CHUNK_TOKENS are logged, they will be truncated by the embedding models.
 
         Parameters:
             documents (List[Document]): A List of Verba documents to be checked.
 
         Returns:
-            int: The number of batches created from the chunks in the documents. If no batches are created, 0 is returned.
-
-        Raises:
-            IndexError: If no batches are created.
+            int: The number of chunks checked. If there are no chunks, 0 is returned.
         """
-
-        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-
-        try:
-            for document in documents:
-                chunks = document.chunks
-                for chunk in chunks:
-                    tokens = encoding.encode(chunk.text, disallowed_special=())
-                    chunk.set_tokens(tokens)
-                    while self.token_count <1000:
-                        for token in tokens:
-                            self.token_count += 1
-                            self.batch.append(token)
-                            if len(self.batch) >= 1000:
-                                self.batch = []
-                                self.token_count = 0
-                                break
-                            self.batches.append(self.batch)
-        except IndexError as e:
-            logger.error(f"no batchs created.{e}")
-            return 0
-        return len(self.batches)
+        chunk_count = 0
+        oversized = 0
+        for document in documents:
+            for chunk in document.chunks:
+                if not isinstance(chunk.tokens, int) or chunk.tokens <= 0:
+                    chunk.set_tokens(
+                        len(encoding.encode(chunk.text, disallowed_special=()))
+                    )
+                if chunk.tokens > MAX_CHUNK_TOKENS:
+                    oversized += 1
+                chunk_count += 1
+        if oversized:
+            logger.warning(f"{oversized} chunks exceed {MAX_CHUNK_TOKENS} tokens")
+        if not chunk_count:
+            logger.error("no chunks created.")
+        return chunk_count
+
+if __name__ == "__main__":
+    errors = check_components(CHUNKERS)
+    for name, error in errors.items():
+        logger.error(f"{name}: {error}")
+    if errors:
+        raise SystemExit(1)
+    for path, seconds in benchmark_startup(list(CHUNKERS.values())).items():
+        logger.info(f"{path}: import {seconds['import']:.2f}s, construct {seconds['construct']:.2f}s")
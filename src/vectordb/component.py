@@ -1,10 +1,115 @@
-from typing_extensions import List
-from pydantic import BaseModel
+import importlib
+import multiprocessing
+import threading
+import time
+from loguru import logger
+from typing_extensions import Dict, List
+from pydantic import BaseModel, ConfigDict
 
 
 class Component(BaseModel):
+    # subclasses keep models, clients and settings as attributes set in __init__
+    model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
+
     name: str
     requires_env: List[str]
     requires_library: List[str]
     description: str
 
+
+
+# Components shared by every manager in the process, keyed by "module:Class"
+_shared_components: Dict[str, Component] = {}
+_shared_components_lock = threading.Lock()
+
+
+def get_shared_component(path: str) -> Component:
+    """
+    Imports and instantiates a component on first use and returns the same instance afterwards,
+    so heavy models and pipelines are loaded at most once per process.
+
+    Args:
+        path (str): The component as "module:Class".
+
+    Returns:
+        Component: The shared instance of the component.
+    """
+    with _shared_components_lock:
+        if path not in _shared_components:
+            _shared_components[path] = resolve_component(path)()
+        return _shared_components[path]
+
+
+def resolve_component(path: str) -> type:
+    """
+    Imports the module of a component and returns its class without instantiating it.
+
+    Args:
+        path (str): The component as "module:Class".
+
+    Returns:
+        type: The component class.
+
+    Raises:
+        ImportError: If the module cannot be imported or does not define the class.
+    """
+    module_name, class_name = path.split(":")
+    module = importlib.import_module(module_name)
+    if not hasattr(module, class_name):
+        raise ImportError(f"{module_name} has no component {class_name}")
+    return getattr(module, class_name)
+
+
+def check_components(components: Dict[str, str]) -> Dict[str, str]:
+    """
+    Resolves every registered component, so a registry entry pointing to a missing module or class
+    is reported before a manager tries to construct it.
+
+    Args:
+        components (Dict[str, str]): Registry of component names to "module:Class".
+
+    Returns:
+        Dict[str, str]: Per component name that failed to resolve its error, empty if all resolve.
+    """
+    errors = {}
+    for name, path in components.items():
+        try:
+            component_class = resolve_component(path)
+            if not issubclass(component_class, Component):
+                errors[name] = f"{path} is not a Component"
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return errors
+
+
+def measure_startup(path: str) -> Dict[str, float]:
+    """
+    Measures the seconds spent importing and constructing a component.
+    """
+    start = time.perf_counter()
+    component_class = resolve_component(path)
+    imported = time.perf_counter()
+    component_class()
+    return {"import": imported - start, "construct": time.perf_counter() - imported}
+
+
+def benchmark_startup(paths: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Startup benchmark of components, each one measured in a fresh process so import caches
+    of previously measured components do not hide its cost.
+
+    Args:
+        paths (List[str]): The components as "module:Class".
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per component its import and construction seconds.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for path in paths:
+        with context.Pool(1) as pool:
+            try:
+                results[path] = pool.apply(measure_startup, (path,))
+            except Exception as e:
+                logger.warning(f"{path} failed to start: {e}")
+    return results
@@ -2,16 +2,23 @@
 ADAEmbedder. Based on Weaviate's Verba.
 """
 import os
-import openai
 from weaviate.client import Client
 from typing_extensions import List
 from dotenv import load_dotenv
 
 from src.vectordb.embedders.interface import Embedder
+from src.vectordb.embedders.remote_batch import TokenRateLimiter, embed_chunks
 from src.vectordb.readers.document import Document
+from src.utils.openai_clients import OPENAI_EMBEDDING_MODEL, embeddings_client
 
 load_dotenv()
 
+# Tokens per minute allowed by the OpenAI account for the embedding model
+OPENAI_EMBEDDING_TPM = int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000"))
+# Token and input limits of a single embeddings request
+OPENAI_EMBEDDING_REQUEST_TOKENS = 100000
+OPENAI_EMBEDDING_REQUEST_INPUTS = 2048
+
 class ADAEmbedder(Embedder):
     """
     ADAEmbedder for Verba.
@@ -28,8 +35,9 @@ class ADAEmbedder(Embedder):
             description="Embeds and retrieves objects using OpenAI's ADA model",
         )
         self.vectorizer = "text2vec-openai"
-        self.openai = openai.OpenAI()
-        self.openai.api_key = str(os.getenv("OPENAI_API_KEY"))
+        self.openai = embeddings_client
+        self.model_version = OPENAI_EMBEDDING_MODEL
+        self.limiter = TokenRateLimiter(OPENAI_EMBEDDING_TPM)
 
     def embed(
         self,
@@ -38,14 +46,52 @@ class ADAEmbedder(Embedder):
         batch_size: int = 100
     ) -> bool:
         """
-        Embeds the given list of documents and their chunks into Weaviate using the SentenceTransformer model.
+        Embeds the chunks of the given documents with batched, concurrent requests to the OpenAI embeddings API
+        and imports the documents and their vectors into Weaviate.
         Parameters:
             documents (List[Document]): A list of Document objects representing the documents to be embedded.
             client (Client): The Weaviate client used to import the embedded data.
         Returns:
             bool
         """
+        self.vectorize_documents(documents)
         return self.import_data(documents, client)
-    
+
+    def vectorize_documents(self, documents: List[Document]):
+        """
+        Sets the vectors of the chunks of the given documents, loading unchanged chunks from the embedding cache.
+
+        Parameters:
+            documents (List[Document]): A list of Document objects whose chunks are vectorized.
+
+        Returns:
+            None
+        """
+        missing = self.load_cached_vectors(
+            [chunk for document in documents for chunk in document.chunks]
+        )
+        embed_chunks(
+            missing,
+            self.vectorize_batch,
+            self.limiter,
+            OPENAI_EMBEDDING_REQUEST_TOKENS,
+            OPENAI_EMBEDDING_REQUEST_INPUTS,
+        )
+        self.save_vectors(missing)
+        for document in documents:
+            document.pack_vectors()
+
+    def vectorize_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Sends one embeddings request, retries are left to the caller.
+        """
+        response = self.openai.with_options(max_retries=0).embeddings.create(
+            input=texts, model=OPENAI_EMBEDDING_MODEL
+        )
+        return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+
     def vectorize_query(self, query: str):
-        return self.openai.embeddings.create(input=[query], model="text-embedding-ada-002")
\ No newline at end of file
+        return self.vectorize_batch([query])[0]
+
+    def vectorize_queries(self, queries: List[str]) -> List[List[float]]:
+        return self.vectorize_batch(queries)
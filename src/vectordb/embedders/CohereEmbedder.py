@@ -2,11 +2,24 @@
 Cohere Embedder. Based on Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
+import os
+import cohere
 from weaviate.client import Client
 from typing_extensions import List
+from dotenv import load_dotenv
 
 from src.vectordb.embedders.interface import Embedder
+from src.vectordb.embedders.remote_batch import TokenRateLimiter, embed_chunks
 from src.vectordb.readers.document import Document
+from src.vectordb.schema.schema_generator import COHERE_EMBEDDING_MODEL
+
+load_dotenv()
+
+# Tokens per minute the Cohere embeddings are throttled to
+COHERE_EMBEDDING_TPM = int(os.getenv("COHERE_EMBEDDING_TPM", "1000000"))
+# Token and input limits of a single embed request
+COHERE_EMBEDDING_REQUEST_TOKENS = 50000
+COHERE_EMBEDDING_REQUEST_INPUTS = 96
 
 
 class CohereEmbedder(Embedder):
@@ -20,7 +33,7 @@ class CohereEmbedder(Embedder):
         This method initializes the CohereEmbedder class with the necessary parameters for embedding and retrieving
         objects using Cohere's ember multilingual-v2.0 model. It sets the description, name, requires_env, and
         requires_library attributes. The requires_env attribute is set to a list containing the "COHERE_API_KEY"
-        environment variable, while the requires_library attribute is set to None. The vectorizer attribute is set
+        environment variable, while the requires_library attribute is set to ["cohere"]. The vectorizer attribute is set
         to "text2vec-cohere".
 
         Parameters:
@@ -33,10 +46,12 @@ class CohereEmbedder(Embedder):
             description=("Embeds and retrieves objects using Cohere's ember multilingual-v2.0 model"),
             name="CohereEmbedder",
             requires_env=["COHERE_API_KEY"],
-            requires_library=None
+            requires_library=["cohere"]
             )
         self.vectorizer = "text2vec-cohere"
-        self.tokenizer = CohereEmbedder()
+        self.cohere = cohere.Client(os.getenv("COHERE_API_KEY"))
+        self.model_version = COHERE_EMBEDDING_MODEL
+        self.limiter = TokenRateLimiter(COHERE_EMBEDDING_TPM)
 
     def embed(
         self,
@@ -45,7 +60,8 @@ class CohereEmbedder(Embedder):
         batch_size: int = 100
     ) -> bool:
         """
-        Embeds the given list of documents and their chunks into Weaviate using the SentenceTransformer model.
+        Embeds the chunks of the given documents with batched, concurrent requests to the Cohere embed API
+        and imports the documents and their vectors into Weaviate.
 
         Parameters:
             documents (List[Document]): A list of Document objects representing the documents to be embedded.
@@ -55,4 +71,42 @@ class CohereEmbedder(Embedder):
         Returns:
             bool: True if the embedding and import were successful, False otherwise.
         """
-        return self.tokenizer.embed(documents, client)
+        self.vectorize_documents(documents)
+        return self.import_data(documents, client)
+
+    def vectorize_documents(self, documents: List[Document]):
+        """
+        Sets the vectors of the chunks of the given documents, loading unchanged chunks from the embedding cache.
+
+        Parameters:
+            documents (List[Document]): A list of Document objects whose chunks are vectorized.
+
+        Returns:
+            None
+        """
+        missing = self.load_cached_vectors(
+            [chunk for document in documents for chunk in document.chunks]
+        )
+        embed_chunks(
+            missing,
+            self.vectorize_batch,
+            self.limiter,
+            COHERE_EMBEDDING_REQUEST_TOKENS,
+            COHERE_EMBEDDING_REQUEST_INPUTS,
+        )
+        self.save_vectors(missing)
+        for document in documents:
+            document.pack_vectors()
+
+    def vectorize_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Sends one embed request, retries are left to the caller.
+        """
+        return self.cohere.embed(texts=texts, model=COHERE_EMBEDDING_MODEL).embeddings
+
+    def vectorize_query(self, query: str) -> List[float]:
+        return self.vectorize_batch([query])[0]
+
+    def vectorize_queries(self, queries: List[str]) -> List[List[float]]:
+        return self.vectorize_batch(queries)
+
@@ -2,24 +2,104 @@
 Mini LM Embedder. Based on Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
+import inspect
+import os
 from tqdm import tqdm
 from weaviate import Client
 import torch
-from transformers import AutoModel, AutoTokenizer
-from typing import List, Union
+from transformers import AutoConfig, AutoModel, AutoTokenizer
+from typing import Dict, List, Optional, Union
 from loguru import logger
 
-from goldenverba.components.embedding.interface import Embedder
-from goldenverba.components.reader.document import Document
+from src.vectordb.embedders.interface import Embedder
+from src.vectordb.readers.document import Document
+
+# Number of token windows run through the model per forward pass
+MINILM_BATCH_SIZE = int(os.getenv("MINILM_BATCH_SIZE", "32"))
+# "torch" runs the transformers model, "onnx" runs an ONNX export with onnxruntime on CPU
+MINILM_BACKEND = os.getenv("MINILM_BACKEND", "torch")
+# Dynamically quantize the ONNX export to int8
+MINILM_QUANTIZE = os.getenv("MINILM_QUANTIZE", "false").lower() in ("1", "true")
+# Directory the ONNX exports are cached in, an empty value keeps the default
+MINILM_ONNX_DIR = os.getenv("MINILM_ONNX_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "hexamerous", "onnx"
+)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Bumped whenever tokenization or pooling changes the vectors. Version 2 mean pools every
+# token window over its attention mask. It is part of model_version, and so of the chunk UUIDs,
+# so re-importing a document replaces chunks that were stored with vectors of an older version
+POOLING_VERSION = 2
+
+
+class LastHiddenState(torch.nn.Module):
+    """
+    Wraps the transformer so the ONNX export has a single last_hidden_state output.
+    """
+    def __init__(self, model: AutoModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+
+def export_onnx(quantize: bool = False, onnx_dir: str = MINILM_ONNX_DIR) -> str:
+    """
+    Exports all-MiniLM-L6-v2 to ONNX, optionally quantized to int8, unless the export is already cached.
+
+    Parameters:
+        quantize (bool): Whether to return the dynamically int8 quantized export.
+        onnx_dir (str): The directory the exports are cached in.
+
+    Returns:
+        str: The path of the ONNX file.
+    """
+    path = os.path.join(onnx_dir, "all-MiniLM-L6-v2.onnx")
+    quantized_path = os.path.join(onnx_dir, "all-MiniLM-L6-v2-int8.onnx")
+    if not os.path.exists(path):
+        os.makedirs(onnx_dir, exist_ok=True)
+        logger.info(f"Exporting {MODEL_NAME} to {path}")
+        model = AutoModel.from_pretrained(MODEL_NAME).eval()
+        dummy = torch.ones(1, 8, dtype=torch.long)
+        # a padded position keeps the attention mask in the traced graph
+        dummy_mask = torch.ones(1, 8, dtype=torch.long)
+        dummy_mask[0, -1] = 0
+        export_options = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # the dynamo exporter, the default since torch 2.9, breaks parity with torch
+            export_options["dynamo"] = False
+        torch.onnx.export(
+            LastHiddenState(model),
+            (dummy, dummy_mask),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+            **export_options,
+        )
+    if not quantize:
+        return path
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"Quantizing {path} to {quantized_path}")
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
 
 
 class MiniLMEmbedder(Embedder):
     """
     MiniLMEmbedder for Verba.
     """
-    model: AutoModel
-    tokenizer: AutoTokenizer
-    def __init__(self):
+    model: Optional[AutoModel] = None
+    tokenizer: Optional[AutoTokenizer] = None
+    def __init__(self, backend: str = MINILM_BACKEND, quantize: bool = MINILM_QUANTIZE):
         """
         Initializes the MiniLMEmbedder class.
 
@@ -27,18 +107,30 @@ class MiniLMEmbedder(Embedder):
 
         The function then loads the pre-trained model and tokenizer from the "sentence-transformers/all-MiniLM-L6-v2" repository using the AutoModel and AutoTokenizer classes from the transformers library. The model and tokenizer are moved to the device obtained earlier.
 
+        With the "onnx" backend the model is exported to ONNX once, optionally quantized to int8, cached on disk
+        and run with onnxruntime on the CPU instead.
+
         If there is a RuntimeError during the initialization process, a warning message is logged.
         Parameters:
-            None
+            backend (str): "torch" or "onnx".
+            quantize (bool): Whether the onnx backend runs the int8 quantized export.
 
         Returns:
             None
         """
-        super().__init__()
-        self.name = "MiniLMEmbedder"
-        self.requires_library = ["torch", "transformers"]
-        self.description = "Embeds and retrieves objects using SentenceTransformer's all-MiniLM-L6-v2 model"
+        super().__init__(
+            name="MiniLMEmbedder",
+            requires_env=[],
+            requires_library=["torch", "transformers"],
+            description="Embeds and retrieves objects using SentenceTransformer's all-MiniLM-L6-v2 model",
+        )
         self.vectorizer = "MiniLM"
+        self.backend = backend
+        self.model_version = f"{MODEL_NAME}:pool{POOLING_VERSION}:{backend}"
+        if backend == "onnx":
+            self.requires_library = ["onnxruntime", "transformers"]
+            if quantize:
+                self.model_version += "-int8"
 
         try:
             def get_device():
@@ -55,16 +147,26 @@ class MiniLMEmbedder(Embedder):
                 else:
                     return torch.device("cpu")
 
-            self.device = get_device()
+            if backend == "onnx":
+                import onnxruntime
+
+                self.device = torch.device("cpu")
+                self.session = onnxruntime.InferenceSession(
+                    export_onnx(quantize), providers=["CPUExecutionProvider"]
+                )
+                self.config = AutoConfig.from_pretrained(MODEL_NAME)
+            else:
+                self.device = get_device()
+                self.model = AutoModel.from_pretrained(
+                    MODEL_NAME, device_map=self.device
+                )
+                self.model = self.model.to(self.device)
+                self.config = self.model.config
 
-            self.model = AutoModel.from_pretrained(
-                "sentence-transformers/all-MiniLM-L6-v2", device_map=self.device
-            )
             self.tokenizer = AutoTokenizer.from_pretrained(
-                pretrained_model_name_or_path="sentence-transformers/all-MiniLM-L6-v2", 
+                pretrained_model_name_or_path=MODEL_NAME,
                 device_map=self.device
             )
-            self.model = self.model.to(self.device)
 
         except RuntimeError as e:
             logger.warning(str(e))
@@ -84,17 +186,115 @@ class MiniLMEmbedder(Embedder):
         Returns:
             bool: True if the embedding and import were successful, False otherwise.
         """
-        for document in tqdm(
-            documents, total=len(documents), desc="Vectorizing document chunks"
-        ):
-            for chunk in document.chunks:
-                chunk.set_vector(self.vectorize_chunk(chunk.text))
-
+        self.vectorize_documents(documents)
         return self.import_data(documents, client)
 
+    def vectorize_documents(self, documents: List[Document]):
+        """
+        Sets the vectors of the chunks of the given documents, loading unchanged chunks from the embedding cache.
+
+        Parameters:
+            documents (List[Document]): A list of Document objects whose chunks are vectorized.
+
+        Returns:
+            None
+        """
+        missing = self.load_cached_vectors(
+            [chunk for document in documents for chunk in document.chunks]
+        )
+        vectors = self.vectorize_chunks([chunk.text for chunk in missing])
+        for chunk, vector in zip(missing, vectors):
+            chunk.set_vector(vector)
+        self.save_vectors(missing)
+        for document in documents:
+            document.pack_vectors()
+
+    def vectorize_chunks(
+        self, texts: List[str], batch_size: int = MINILM_BATCH_SIZE
+    ) -> List[List[float]]:
+        """
+        Vectorize a list of texts with batched inference.
+
+        All texts are tokenized in one call and split into windows of at most the model's
+        max sequence length. The windows are sorted by length so every padded batch holds
+        windows of similar length, run through the model under inference mode and mean pooled
+        over their attention mask. A text's vector is the average of its windows' vectors.
+
+        Parameters:
+            texts (List[str]): The texts to be vectorized.
+            batch_size (int): The number of windows per forward pass.
+
+        Returns:
+            List[List[float]]: One vector per text, in the order of the texts.
+        """
+        if not texts:
+            return []
+        # MiniLM is a BERT model, every window is wrapped in [CLS] ... [SEP]
+        cls_id, sep_id = self.tokenizer.cls_token_id, self.tokenizer.sep_token_id
+        max_length = min(
+            self.tokenizer.model_max_length,
+            self.config.max_position_embeddings,
+        ) - 2
+        token_ids = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+
+        windows = []
+        owners = []
+        for text_index, ids in enumerate(token_ids):
+            for start in range(0, max(len(ids), 1), max_length):
+                windows.append([cls_id] + ids[start : start + max_length] + [sep_id])
+                owners.append(text_index)
+
+        order = sorted(range(len(windows)), key=lambda index: len(windows[index]))
+        sums = torch.zeros(len(texts), self.config.hidden_size)
+        counts = torch.zeros(len(texts), 1)
+
+        with torch.inference_mode():
+            for start in tqdm(
+                range(0, len(order), batch_size),
+                total=(len(order) + batch_size - 1) // batch_size,
+                desc="Vectorizing chunk batches",
+                disable=len(order) <= batch_size,
+            ):
+                batch = order[start : start + batch_size]
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [windows[index] for index in batch]},
+                    return_tensors="pt",
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                last_hidden_state = self.run_model(inputs)
+                mask = inputs["attention_mask"].unsqueeze(-1).to(last_hidden_state.dtype)
+                embeddings = (last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                batch_owners = torch.tensor([owners[index] for index in batch])
+                sums.index_add_(0, batch_owners, embeddings.float().cpu())
+                counts.index_add_(0, batch_owners, torch.ones(len(batch), 1))
+
+        return (sums / counts).tolist()
+
+    def run_model(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """
+        Runs a padded batch through the selected backend.
+
+        Parameters:
+            inputs (Dict[str, torch.Tensor]): The input_ids and attention_mask of the batch.
+
+        Returns:
+            torch.Tensor: The last hidden state of the batch.
+        """
+        if self.backend == "onnx":
+            (last_hidden_state,) = self.session.run(
+                ["last_hidden_state"],
+                {
+                    "input_ids": inputs["input_ids"].numpy(),
+                    "attention_mask": inputs["attention_mask"].numpy(),
+                },
+            )
+            return torch.from_numpy(last_hidden_state)
+        return self.model(**inputs).last_hidden_state
+
     def vectorize_chunk(self, chunk) -> Union[List[float], None]:
         """
         Vectorize a chunk of text into a list of floats representing the average embedding of the tokens in the chunk.
+        Texts longer than the model's max sequence length are averaged over their windows.
         
         Parameters:
             chunk (str): The text chunk to be vectorized.
@@ -106,54 +306,7 @@ class MiniLMEmbedder(Embedder):
             RuntimeError: If there is an error creating the embeddings.
         """
         try:
-            text = chunk
-            tokens = self.tokenizer.tokenize(text)
-
-            max_length = (
-                self.tokenizer.model_max_length
-            )  # Get the max sequence length for the model
-            batches = []
-            batch = []
-            token_count = 0
-
-            for token in tokens:
-                token_length = len(
-                    self.tokenizer.encode(token, add_special_tokens=False)
-                )
-                if token_count + token_length <= max_length:
-                    batch.append(token)
-                    token_count += token_length
-                else:
-                    batches.append(" ".join(batch))
-                    batch = [token]
-                    token_count = token_length
-
-            # Don't forget to add the last batch
-            if batch:
-                batches.append(" ".join(batch))
-
-            embeddings = []
-
-            for batch in batches:
-                inputs = self.tokenizer(
-                    text=batch,
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True
-                )
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-                # Taking the mean of the hidden states to obtain an embedding for the batch
-                embedding = outputs.last_hidden_state.mean(dim=1)
-                embeddings.append(embedding)
-
-            # Concatenate the embeddings to make averaging easier
-            all_embeddings = torch.cat(embeddings)
-
-            averaged_embedding = all_embeddings.mean(dim=0)
-
-            return averaged_embedding.tolist()
+            return self.vectorize_chunks([chunk])[0]
         except RuntimeError as e:
             logger.warning(str(e))
 
@@ -166,4 +319,16 @@ class MiniLMEmbedder(Embedder):
         :return: A list of floats representing the vectorized query.
         :rtype: List[float]
         """
-        return self.vectorize_chunk(query)
\ No newline at end of file
+        return self.vectorize_chunk(query)
+
+    def vectorize_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Vectorizes a list of queries in batches with the vectorize_chunks method.
+
+        :param queries: The queries to be vectorized.
+        :type queries: List[str]
+        :return: One vector per query, in the order of the queries.
+        :rtype: List[List[float]]
+        """
+        return self.vectorize_chunks(queries)
+
@@ -1,28 +1,28 @@
 """
-Mini LM Embedder. Based on Weaviate's Verba.
+Sentence Embedder, all-MiniLM-L6-v2 with unmasked pooling. Based on Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
 import torch
 from tqdm import tqdm
 from transformers import AutoModel, AutoTokenizer
-from typing import List
+from typing import List, Optional
 from weaviate.client import Client
 from loguru import logger
 
 from src.vectordb.readers.document import Document
 from src.vectordb.embedders.interface import Embedder
 
-class MiniLMEmbedder(Embedder):
+class SentenceEmbedder(Embedder):
     """
-    MiniLMEmbedder for Verba.
+    SentenceEmbedder for Verba.
     """
-    model = AutoModel
-    tokenizer = AutoTokenizer
+    model: Optional[AutoModel] = None
+    tokenizer: Optional[AutoTokenizer] = None
     def __init__(self):
         """
-        Initializes the MiniLMEmbedder class.
+        Initializes the SentenceEmbedder class.
 
-        This function initializes the MiniLMEmbedder class by setting the name, required libraries, description, and vectorizer attributes. It also attempts to get the device on which the model will be run. If a CUDA-enabled GPU is available, it uses that device. If not, it checks if the Multi-Process Service (MPS) is available and uses that device. If neither a CUDA device nor an MPS device is available, it falls back to using the CPU.
+        This function initializes the SentenceEmbedder class by setting the name, required libraries, description, and vectorizer attributes. It also attempts to get the device on which the model will be run. If a CUDA-enabled GPU is available, it uses that device. If not, it checks if the Multi-Process Service (MPS) is available and uses that device. If neither a CUDA device nor an MPS device is available, it falls back to using the CPU.
 
         The function then loads the pre-trained model and tokenizer from the "sentence-transformers/all-MiniLM-L6-v2" repository using the AutoModel and AutoTokenizer classes from the transformers library. The model and tokenizer are moved to the device obtained earlier.
 
@@ -34,11 +34,15 @@ class MiniLMEmbedder(Embedder):
         Returns:
             None
         """
-        super().__init__()
-        self.name = "MiniLMEmbedder"
-        self.requires_library = ["torch", "transformers"]
-        self.description = "Embeds and retrieves objects using SentenceTransformer's all-MiniLM-L6-v2 model"
+        super().__init__(
+            name="SentenceEmbedder",
+            requires_env=[],
+            requires_library=["torch", "transformers"],
+            description="Embeds and retrieves objects using SentenceTransformer's all-MiniLM-L6-v2 model",
+        )
         self.vectorizer = "MiniLM"
+        # Pools without the attention mask, its vectors differ from MiniLMEmbedder's
+        self.model_version = "sentence-transformers/all-MiniLM-L6-v2:unmasked"
         try:
             def get_device():
                 """
@@ -82,14 +86,28 @@ class MiniLMEmbedder(Embedder):
         Returns:
             bool: True if the embedding and import were successful, False otherwise.
         """
-        for document in tqdm(
-            documents, total=len(documents), desc="Vectorizing document chunks"
-        ):
-            for chunk in document.chunks:
-                chunk.set_vector(self.vectorize_chunk(chunk.text))
-
+        self.vectorize_documents(documents)
         return self.import_data(documents, client)
 
+    def vectorize_documents(self, documents: List[Document]):
+        """
+        Sets the vectors of the chunks of the given documents, loading unchanged chunks from the embedding cache.
+
+        Parameters:
+            documents (List[Document]): A list of Document objects whose chunks are vectorized.
+
+        Returns:
+            None
+        """
+        missing = self.load_cached_vectors(
+            [chunk for document in documents for chunk in document.chunks]
+        )
+        for chunk in tqdm(missing, total=len(missing), desc="Vectorizing document chunks"):
+            chunk.set_vector(self.vectorize_chunk(chunk.text))
+        self.save_vectors(missing)
+        for document in documents:
+            document.pack_vectors()
+
     def vectorize_chunk(self, chunk) -> List[float]:
         """
         Vectorize a chunk of text into a list of floats representing the average embedding of the tokens in the chunk.
@@ -0,0 +1,96 @@
+"""
+Embedding Cache. Persists chunk vectors on disk keyed by vectorizer, model version and
+the sha256 of the chunk text, so unchanged chunks are never embedded twice.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# SQLite file of the cache, an empty value disables it
+EMBEDDING_CACHE_PATH = os.path.expanduser(
+    os.getenv("EMBEDDING_CACHE_PATH", os.path.join("~", ".cache", "hexamerous", "embeddings.sqlite"))
+)
+# Hashes looked up per query, below SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite table of float32 vector blobs keyed by (vectorizer, model, sha256 of the text).
+    """
+
+    def __init__(self, path: Optional[str] = EMBEDDING_CACHE_PATH):
+        """
+        Initializes the cache, the SQLite file is opened or created on first use.
+
+        Args:
+            path (Optional[str]): The SQLite file, None or empty disables the cache.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.db: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+    def connect(self) -> Optional[sqlite3.Connection]:
+        """
+        Returns the SQLite connection, opening or creating the file on first use. Called with the lock held.
+        """
+        if self.db is None and self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(vectorizer TEXT, model TEXT, hash TEXT, vector BLOB, "
+                "PRIMARY KEY (vectorizer, model, hash))"
+            )
+            self.db.commit()
+        return self.db
+
+    def get_many(self, vectorizer: str, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Returns the cached vectors of the given text hashes as float32 arrays, hashes without a vector are left out.
+        """
+        if not self.path:
+            return {}
+        hashes = list(dict.fromkeys(hashes))
+        vectors = {}
+        with self.lock:
+            db = self.connect()
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                batch = hashes[start : start + LOOKUP_BATCH_SIZE]
+                rows = db.execute(
+                    "SELECT hash, vector FROM embeddings WHERE vectorizer = ? AND model = ? "
+                    f"AND hash IN ({','.join('?' * len(batch))})",
+                    (vectorizer, model, *batch),
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vectors[text_hash] = np.frombuffer(blob, dtype=np.float32)
+        return vectors
+
+    def put_many(self, vectorizer: str, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """
+        Stores (text hash, vector) pairs as float32 blobs.
+        """
+        if not self.path:
+            return
+        rows = [
+            (vectorizer, model, text_hash, np.asarray(vector, dtype=np.float32).tobytes())
+            for text_hash, vector in items
+            if vector is not None
+        ]
+        if not rows:
+            return
+        with self.lock:
+            db = self.connect()
+            db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            db.commit()
+
+
+# Shared by every embedder in the process
+embedding_cache = EmbeddingCache()
@@ -2,15 +2,70 @@
 Embedder Interface. Based on Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
+import json
+import os
+from contextlib import contextmanager
 from tqdm import tqdm
 from typing import List, Dict, Tuple, Union, Optional
+from uuid import UUID
 from weaviate import Client
+from weaviate.util import generate_uuid5
 from loguru import logger
 from src.vectordb.readers.document import Document
 from src.vectordb.readers.interface import InputForm
 from src.vectordb.component import Component
+from src.vectordb.chunkers.chunk import Chunk
+from src.vectordb.embedders.embedding_cache import embedding_cache
+from src.vectordb.embedders.query_cache import normalize_query, query_vector_cache
+from src.vectordb.embedders.semantic_cache import get_local_semantic_cache
 from src.vectordb.schema.schema_generator import VECTORIZERS, EMBEDDINGS, strip_non_letters
 
+# Stream all documents of an import into one dynamic batch instead of importing them one by one
+WEAVIATE_BULK_IMPORT = os.getenv("WEAVIATE_BULK_IMPORT", "false").lower() in ("1", "true")
+# Threads sending the batches of a bulk import
+WEAVIATE_IMPORT_WORKERS = int(os.getenv("WEAVIATE_IMPORT_WORKERS", "4"))
+# Initial objects per batch of a bulk import, adjusted by Weaviate's dynamic batching
+WEAVIATE_IMPORT_BATCH_SIZE = int(os.getenv("WEAVIATE_IMPORT_BATCH_SIZE", "100"))
+# UUIDs per ContainsAny filter when diffing or deleting objects of a bulk import
+UUID_FILTER_BATCH_SIZE = 1000
+# Upper bound on the chunks of a single document read back when diffing, Weaviate's default query maximum
+MAX_DOCUMENT_CHUNKS = 10000
+
+
+@contextmanager
+def configured_batch(client: Client, **options):
+    """
+    Configures client.batch for the duration of the block and restores its previous configuration,
+    client.batch is shared by every import through the client.
+
+    Args:
+        client (Client): The Weaviate client.
+        **options: Keyword arguments of Batch.configure.
+
+    Yields:
+        Batch: The configured client.batch.
+    """
+    batch = client.batch
+    previous = {
+        "batch_size": batch.batch_size,
+        "creation_time": batch.creation_time,
+        "timeout_retries": batch.timeout_retries,
+        "connection_error_retries": batch.connection_error_retries,
+        "weaviate_error_retries": batch._weaviate_error_retry,
+        "callback": batch._callback,
+        "dynamic": batch.dynamic,
+        "num_workers": batch._num_workers,
+        "consistency_level": batch.consistency_level,
+    }
+    batch.configure(**options)
+    try:
+        yield batch
+    finally:
+        if previous["batch_size"] is None and not previous["dynamic"]:
+            # configure ignores num_workers for manual batching, restore them with a fixed batch first
+            batch.configure(**{**previous, "batch_size": 1})
+        batch.configure(**previous)
+
 
 class Embedder(Component):
     """
@@ -43,6 +98,7 @@ class Embedder(Component):
         )
         self.input_form = InputForm.TEXT.value  # Default for all Embedders
         self.vectorizer = ""
+        self.model_version = ""  # Part of the embedding cache key, set by embedders that vectorize client-side
 
     def embed(
         self, 
@@ -66,18 +122,73 @@ class Embedder(Component):
         """
         raise NotImplementedError("embed method must be implemented by a subclass.")
 
+    def vectorize_documents(self, documents: List[Document]):
+        """
+        Sets the vectors of the chunks of the given documents without importing them.
+        Embedders whose vectors are computed by Weaviate leave the chunks unchanged.
+
+        Args:
+            documents (List[Document]): The documents whose chunks are vectorized.
+
+        Returns:
+            None
+        """
+        return None
+
+    def load_cached_vectors(self, chunks: List[Chunk]) -> List[Chunk]:
+        """
+        Sets the vectors of chunks found in the persistent embedding cache.
+
+        Args:
+            chunks (List[Chunk]): The chunks to look up by the sha256 of their text.
+
+        Returns:
+            List[Chunk]: The chunks that still need to be embedded.
+        """
+        missing = [chunk for chunk in chunks if chunk.vector is None]
+        cached = embedding_cache.get_many(
+            self.vectorizer, self.model_version, (chunk.content_hash for chunk in missing)
+        )
+        for chunk in missing:
+            vector = cached.get(chunk.content_hash)
+            if vector is not None:
+                chunk.set_vector(vector)
+        remaining = [chunk for chunk in missing if chunk.vector is None]
+        if len(remaining) < len(missing):
+            logger.info(f"Loaded {len(missing) - len(remaining)} vectors from the embedding cache")
+        return remaining
+
+    def save_vectors(self, chunks: List[Chunk]):
+        """
+        Stores the vectors of freshly embedded chunks in the persistent embedding cache.
+
+        Args:
+            chunks (List[Chunk]): The embedded chunks.
+
+        Returns:
+            None
+        """
+        embedding_cache.put_many(
+            self.vectorizer,
+            self.model_version,
+            ((chunk.content_hash, chunk.vector) for chunk in chunks),
+        )
+
     def import_data(
         self,
         documents: List[Document],
         client: Client,
+        bulk: bool = WEAVIATE_BULK_IMPORT,
     ) -> bool:
         """
-        Imports data into the Weaviate client.
+        Imports data into the Weaviate client. Documents and chunks get deterministic UUIDs, so
+        re-importing a document upserts it, see prepare_upsert.
 
         Args:
             self (Embedder): The Embedder instance.
             documents (List[Document]): The list of Document objects to import.
             client (Client): The Weaviate client.
+            bulk (bool): Whether to import all documents in one dynamic batch, see bulk_import_data.
 
         Returns:
             bool: True if the data is successfully imported, False otherwise.
@@ -90,9 +201,16 @@ class Embedder(Component):
                 logger.warning(f"Vectorizer of {self.name} not found")
                 return False
 
+            if bulk:
+                return self.bulk_import_data(documents, client)
+
+            doc_class_name = self.get_document_class()
+            chunk_class_name = self.get_chunk_class()
+            doc_uuids = {id(document): self.document_uuid(document) for document in documents}
+            unchanged, vanished = self.prepare_upsert(client, documents, doc_uuids)
             for i, document in enumerate(documents):
+                doc_uuid = doc_uuids[id(document)]
                 batches = []
-                uuid = ""
                 temp_batch = []
                 token_counter = 0
                 for chunk in document.chunks:
@@ -119,26 +237,25 @@ class Embedder(Component):
                     properties = {
                         "text": str(document.text),
                         "doc_name": str(document.name),
-                        "doc_type": str(document.type),
+                        "doc_type": str(document.doc_type),
                         "doc_link": str(document.link),
                         "chunk_count": len(document.chunks),
                         "timestamp": str(document.timestamp),
                     }
-
-                    class_name = f"Document_{strip_non_letters(self.vectorizer)}"
-                    uuid = client.batch.add_data_object(properties, class_name)
+                    client.batch.add_data_object(properties, doc_class_name, uuid=doc_uuid)
 
                     for chunk in document.chunks:
-                        chunk.set_uuid(uuid)
+                        chunk.set_uuid(doc_uuid)
 
-                chunk_count = 0
                 for _batch_id, chunk_batch in tqdm(
                     enumerate(batches), total=len(batches), desc="Importing batches"
                 ):
                     with client.batch as batch:
                         batch.batch_size = len(chunk_batch)
                         for chunk in chunk_batch:
-                            chunk_count += 1
+                            chunk_uuid = self.chunk_uuid(doc_uuid, chunk)
+                            if chunk_uuid in unchanged:
+                                continue
 
                             properties = {
                                 "text": chunk.text,
@@ -147,29 +264,305 @@ class Embedder(Component):
                                 "doc_type": chunk.doc_type,
                                 "chunk_id": chunk.chunk_id,
                             }
-                            class_name = f"Chunk_{strip_non_letters(self.vectorizer)}"
 
                             # Check if vector already exists
                             if chunk.vector is None:
-                                client.batch.add_data_object(properties, class_name)
+                                client.batch.add_data_object(
+                                    properties, chunk_class_name, uuid=chunk_uuid
+                                )
                             else:
                                 client.batch.add_data_object(
-                                    properties, class_name, vector=chunk.vector
+                                    properties, chunk_class_name, uuid=chunk_uuid, vector=chunk.vector
                                 )
-                if not document.name:
-                    document.__setattr__(name="name", value="uuid", obj=document)
+                self.delete_chunks(client, vanished.get(doc_uuid, []))
                 self.check_document_status(
                     client,
-                    uuid,
+                    doc_uuid,
                     str(document.name),
-                    f"Document_{strip_non_letters(self.vectorizer)}",
-                    f"Chunk_{strip_non_letters(self.vectorizer)}",
+                    doc_class_name,
+                    chunk_class_name,
                     len(document.chunks),
                 )
             return True
         except Exception as e:
             raise ValueError(e) from e
 
+    def document_uuid(self, document: Document) -> str:
+        """
+        Returns the deterministic UUID of a document, derived from its link, or its path or name if it has no link.
+        """
+        return generate_uuid5(
+            str(document.link or document.path or document.name),
+            self.get_document_class(),
+        )
+
+    def chunk_uuid(self, doc_uuid: str, chunk: Chunk) -> str:
+        """
+        Returns the deterministic UUID of a chunk, derived from its document UUID, chunk id, content hash
+        and the model version of the embedder. A chunk whose text or embedding model changed therefore
+        gets a new UUID, and prepare_upsert replaces its stored copy instead of keeping the stale vector.
+        """
+        return generate_uuid5(
+            {
+                "doc_uuid": doc_uuid,
+                "chunk_id": str(chunk.chunk_id),
+                "hash": chunk.content_hash,
+                "model_version": self.model_version,
+            },
+            self.get_chunk_class(),
+        )
+
+    def existing_document_uuids(self, client: Client, doc_uuids: List[str]) -> set:
+        """
+        Returns which of the given document UUIDs already exist in Weaviate.
+        """
+        existing = set()
+        doc_class_name = self.get_document_class()
+        for start in range(0, len(doc_uuids), UUID_FILTER_BATCH_SIZE):
+            batch = doc_uuids[start : start + UUID_FILTER_BATCH_SIZE]
+            results = (
+                client.query.get(class_name=doc_class_name, properties=["doc_name"])
+                .with_additional(properties=["id"])
+                .with_where({"path": ["id"], "operator": "ContainsAny", "valueTextArray": batch})
+                .with_limit(len(batch))
+                .do()
+            )
+            existing.update(
+                result["_additional"]["id"] for result in results["data"]["Get"][doc_class_name]
+            )
+        return existing
+
+    def existing_chunk_uuids(self, client: Client, doc_uuid: str) -> set:
+        """
+        Returns the UUIDs of the chunks stored for a document.
+        """
+        chunk_class_name = self.get_chunk_class()
+        results = (
+            client.query.get(class_name=chunk_class_name, properties=["chunk_id"])
+            .with_additional(properties=["id"])
+            .with_where({"path": ["doc_uuid"], "operator": "Equal", "valueText": doc_uuid})
+            .with_limit(MAX_DOCUMENT_CHUNKS)
+            .do()
+        )
+        return {result["_additional"]["id"] for result in results["data"]["Get"][chunk_class_name]}
+
+    def legacy_document_uuids(self, client: Client, document: Document) -> List[str]:
+        """
+        Returns the UUIDs of copies of a document imported before UUIDs were deterministic. Those got random
+        (version 4) UUIDs from the batch, deterministic UUIDs are version 5.
+        """
+        doc_class_name = self.get_document_class()
+        results = (
+            client.query.get(class_name=doc_class_name, properties=["doc_name"])
+            .with_additional(properties=["id"])
+            .with_where({"path": ["doc_name"], "operator": "Equal", "valueText": str(document.name)})
+            .with_limit(MAX_DOCUMENT_CHUNKS)
+            .do()
+        )
+        return [
+            result["_additional"]["id"]
+            for result in results["data"]["Get"][doc_class_name]
+            # Equal matches tokens of text properties, keep exact names only
+            if result["doc_name"] == str(document.name)
+            and UUID(result["_additional"]["id"]).version != 5
+        ]
+
+    def prepare_upsert(
+        self, client: Client, documents: List[Document], doc_uuids: Dict[int, str]
+    ) -> Tuple[set, Dict[str, List[str]]]:
+        """
+        Diffs documents against Weaviate before they are upserted. For documents that were imported before,
+        the stored chunk UUIDs are compared with the new ones. Documents imported for the first time under
+        their deterministic UUID have the copies imported with random UUIDs removed, so they are replaced
+        instead of duplicated.
+
+        Args:
+            client (Client): The Weaviate client.
+            documents (List[Document]): The documents to upsert.
+            doc_uuids (Dict[int, str]): The deterministic UUID of every document, keyed by id(document).
+
+        Returns:
+            Tuple[set, Dict[str, List[str]]]: The UUIDs of unchanged chunks, which need not be written, and
+            per document UUID the UUIDs of stored chunks that vanished from the document.
+        """
+        existing_docs = self.existing_document_uuids(client, list(set(doc_uuids.values())))
+        unchanged = set()
+        vanished: Dict[str, List[str]] = {}
+        for document in documents:
+            doc_uuid = doc_uuids[id(document)]
+            if doc_uuid not in existing_docs:
+                for legacy_uuid in self.legacy_document_uuids(client, document):
+                    self.remove_document_by_id(client, legacy_uuid)
+                continue
+            stored = self.existing_chunk_uuids(client, doc_uuid)
+            current = {self.chunk_uuid(doc_uuid, chunk) for chunk in document.chunks}
+            unchanged |= stored & current
+            vanished[doc_uuid] = list(stored - current)
+        return unchanged, vanished
+
+    def delete_chunks(self, client: Client, chunk_uuids: List[str]):
+        """
+        Deletes chunks by UUID with ContainsAny filters of at most UUID_FILTER_BATCH_SIZE UUIDs.
+        """
+        for start in range(0, len(chunk_uuids), UUID_FILTER_BATCH_SIZE):
+            client.batch.delete_objects(
+                class_name=self.get_chunk_class(),
+                where={
+                    "path": ["id"],
+                    "operator": "ContainsAny",
+                    "valueTextArray": chunk_uuids[start : start + UUID_FILTER_BATCH_SIZE],
+                },
+            )
+
+    def bulk_import_data(
+        self,
+        documents: List[Document],
+        client: Client,
+        num_workers: int = WEAVIATE_IMPORT_WORKERS,
+        batch_size: int = WEAVIATE_IMPORT_BATCH_SIZE,
+    ) -> bool:
+        """
+        Imports documents and chunks of all documents through one long-lived dynamic batch.
+
+        UUIDs are generated client-side, so chunks are queued right after their document instead of
+        waiting for the document insert. Like the default import, the import is an upsert, see
+        prepare_upsert: only new or changed chunks are written and chunks that vanished from the
+        document are deleted.
+        Once the batch is flushed, the import is verified with a single aggregate request, documents with
+        missing chunks are rolled back.
+
+        Args:
+            documents (List[Document]): The list of Document objects to import.
+            client (Client): The Weaviate client.
+            num_workers (int): The number of threads sending batches.
+            batch_size (int): The initial number of objects per batch.
+
+        Returns:
+            bool: True if the data is successfully imported.
+
+        Raises:
+            ValueError: If objects failed to import or chunks are missing after the import.
+        """
+        doc_class_name = self.get_document_class()
+        chunk_class_name = self.get_chunk_class()
+        errors = []
+
+        def collect_errors(results):
+            for result in results or []:
+                result_errors = result.get("result", {}).get("errors")
+                if result_errors:
+                    errors.append(result_errors)
+
+        doc_uuids = {id(document): self.document_uuid(document) for document in documents}
+        unchanged, vanished_by_document = self.prepare_upsert(client, documents, doc_uuids)
+        vanished = [uuid for uuids in vanished_by_document.values() for uuid in uuids]
+
+        expected: Dict[str, int] = {}
+        upserted = 0
+        with configured_batch(
+            client,
+            batch_size=batch_size,
+            dynamic=True,
+            num_workers=num_workers,
+            callback=collect_errors,
+        ) as batch, batch:
+            for document in tqdm(documents, total=len(documents), desc="Importing documents"):
+                doc_uuid = doc_uuids[id(document)]
+                batch.add_data_object(
+                    {
+                        "text": str(document.text),
+                        "doc_name": str(document.name),
+                        "doc_type": str(document.doc_type),
+                        "doc_link": str(document.link),
+                        "chunk_count": len(document.chunks),
+                        "timestamp": str(document.timestamp),
+                    },
+                    doc_class_name,
+                    uuid=doc_uuid,
+                )
+                for chunk in document.chunks:
+                    chunk.set_uuid(doc_uuid)
+                    chunk_uuid = self.chunk_uuid(doc_uuid, chunk)
+                    if chunk_uuid in unchanged:
+                        continue
+                    upserted += 1
+                    batch.add_data_object(
+                        {
+                            "text": chunk.text,
+                            "doc_name": str(document.name),
+                            "doc_uuid": doc_uuid,
+                            "doc_type": chunk.doc_type,
+                            "chunk_id": chunk.chunk_id,
+                        },
+                        chunk_class_name,
+                        uuid=chunk_uuid,
+                        vector=chunk.vector,
+                    )
+                expected[doc_uuid] = len(document.chunks)
+
+        if errors:
+            raise ValueError(f"{len(errors)} objects failed to import: {errors[:5]}")
+        self.delete_chunks(client, vanished)
+        logger.info(
+            f"Upserted {upserted} chunks, deleted {len(vanished)}, {len(unchanged)} unchanged"
+        )
+        self.check_import_status(client, expected, doc_class_name, chunk_class_name)
+        return True
+
+    def check_import_status(
+        self,
+        client: Client,
+        expected: Dict[str, int],
+        doc_class_name: str,
+        chunk_class_name: str,
+    ):
+        """
+        Verifies a bulk import with one aggregate request counting the imported documents and the chunks
+        of every document. Documents whose chunk count does not match are removed.
+
+        :param client: Client - Weaviate Client
+        :param expected: Dict[str, int] - Expected number of chunks per document UUID
+        :param doc_class_name: str - Class name of Document
+        :param chunk_class_name: str - Class name of Chunks
+        :raises ValueError: If documents are missing or chunk mismatches occur
+        :return: None
+        """
+        if not expected:
+            return
+        uuids = json.dumps(list(expected))
+        results = client.query.raw(
+            "{ Aggregate { "
+            f'{doc_class_name}(where: {{path: ["id"], operator: ContainsAny, valueText: {uuids}}}) '
+            "{ meta { count } } "
+            f'{chunk_class_name}(where: {{path: ["doc_uuid"], operator: ContainsAny, valueText: {uuids}}}, '
+            f'groupBy: ["doc_uuid"], limit: {len(expected)}) '
+            "{ groupedBy { value } meta { count } } "
+            "} }"
+        )
+        if "errors" in results:
+            raise ValueError(f"Import verification failed {results['errors']}")
+
+        aggregate = results["data"]["Aggregate"]
+        document_count = aggregate[doc_class_name][0]["meta"]["count"]
+        chunk_counts = {
+            group["groupedBy"]["value"]: group["meta"]["count"]
+            for group in aggregate[chunk_class_name]
+        }
+        mismatched = [
+            doc_uuid
+            for doc_uuid, chunk_count in expected.items()
+            if chunk_counts.get(doc_uuid, 0) != chunk_count
+        ]
+        for doc_uuid in mismatched:
+            # Rollback if fails
+            self.remove_document_by_id(client, doc_uuid)
+        if document_count != len(expected) or mismatched:
+            raise ValueError(
+                f"Import mismatch, {document_count}/{len(expected)} documents found, "
+                f"chunk mismatch for {len(mismatched)} documents {mismatched[:5]}"
+            )
+        logger.info(f"Imported {len(expected)} documents")
+
     def check_document_status(
         self,
         client: Client,
@@ -348,12 +741,14 @@ class Embedder(Component):
 
     def get_need_vectorization(self) -> bool:
         """
-        Check if the current vectorizer is in the list of embeddings.
+        Check if queries have to be vectorized client-side, because the vectorizer is in the list of
+        embeddings or the embedder computes the chunk vectors itself. Queries are then embedded with
+        the same model as the chunks instead of Weaviate's module config.
 
         Returns:
-            bool: True if the vectorizer is in the list of embeddings, False otherwise.
+            bool: True if queries are vectorized client-side, False otherwise.
         """
-        return self.vectorizer in EMBEDDINGS
+        return self.vectorizer in EMBEDDINGS or bool(self.model_version)
 
     def vectorize_query(self, query: str):
         """
@@ -369,6 +764,56 @@ class Embedder(Component):
             "vectorize_query method must be implemented by a subclass."
         )
 
+    def vectorize_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Vectorizes a list of queries. Embedders that can encode several texts in one
+        call should override this, the default vectorizes the queries one by one.
+
+        :param queries: The queries to be vectorized.
+        :type queries: List[str]
+        :return: One vector per query, in the order of the queries.
+        :rtype: List[List[float]]
+        """
+        return [self.vectorize_query(query) for query in queries]
+
+    def get_query_vector(self, query: str) -> List[float]:
+        """
+        Returns the vector of a query from the process-wide query vector cache,
+        vectorizing it only on a miss.
+
+        :param query: The query to be vectorized.
+        :type query: str
+        :return: A list of floats representing the vectorized query.
+        :rtype: List[float]
+        """
+        return self.get_query_vectors([query])[0]
+
+    def get_query_vectors(self, queries: List[str]) -> List[List[float]]:
+        """
+        Returns the vectors of a list of queries from the process-wide query vector cache,
+        keyed on the vectorizer and model version of this embedder.
+        The distinct queries that are not cached are vectorized together with vectorize_queries.
+
+        :param queries: The queries to be vectorized.
+        :type queries: List[str]
+        :return: One vector per query, in the order of the queries.
+        :rtype: List[List[float]]
+        """
+        vectors = [query_vector_cache.get(self.vectorizer, self.model_version, query) for query in queries]
+        missing = {}
+        for query, vector in zip(queries, vectors):
+            if vector is None:
+                missing.setdefault(normalize_query(query), query)
+        if missing:
+            computed = dict(zip(missing, self.vectorize_queries(list(missing.values()))))
+            for key, vector in computed.items():
+                query_vector_cache.set(self.vectorizer, self.model_version, key, vector)
+            vectors = [
+                vector if vector is not None else computed[normalize_query(query)]
+                for query, vector in zip(queries, vectors)
+            ]
+        return vectors
+
     def conversation_to_query(self, queries: List[str], conversation: Dict) -> str:
         """
         Converts a conversation to a query string by extracting relevant information from the conversation and joining it with the provided queries.
@@ -408,6 +853,7 @@ class Embedder(Component):
     ) -> Union[str, Tuple[Union[str, None], Union[float, None]]]:
         """
         Retrieve results from semantic cache based on query and distance threshold.
+        The process-wide local tier is consulted first, Weaviate only on a local miss.
         
         :param client: The client object used to query the semantic cache.
         :type client: Client
@@ -419,6 +865,20 @@ class Embedder(Component):
         :rtype: Union[Tuple[str, float], Tuple[None, None]]
         """
         needs_vectorization = self.get_need_vectorization()
+        local_cache = get_local_semantic_cache(self.get_cache_class())
+
+        system = local_cache.get_exact(query)
+        if system is not None:
+            logger.info("Direct match from local cache")
+            return system, 0.0
+
+        vector = None
+        if needs_vectorization:
+            vector = self.get_query_vector(query)
+            system, distance = local_cache.get_similar(vector, dist)
+            if system is not None:
+                logger.info("Retrieved similar from local cache")
+                return system, distance
 
         match_results = (
             client.query.get(
@@ -435,20 +895,20 @@ class Embedder(Component):
             .with_limit(1)
         ).do()
         if not match_results["data"]:
+            local_cache.record("misses")
             return None, None
         if "data" in match_results and len(match_results["data"]["Get"][self.get_cache_class()]) > 0 and (
             query
             == match_results["data"]["Get"][self.get_cache_class()][0]["query"]
         ):
             logger.info("Direct match from cache")
-            if not match_results["data"]["Get"][self.get_cache_class()][0]["system"]:
+            system = match_results["data"]["Get"][self.get_cache_class()][0]["system"]
+            if not system:
+                local_cache.record("misses")
                 return None, None
-            return (
-                match_results["data"]["Get"][self.get_cache_class()][0][
-                    "system"
-                ],
-                0.0,
-            )
+            local_cache.record("remote_hits")
+            local_cache.put(query, system, vector)
+            return system, 0.0
 
         query_results = (
             client.query.get(
@@ -460,7 +920,6 @@ class Embedder(Component):
         )
 
         if needs_vectorization:
-            vector = self.vectorize_query(query)
             query_results = query_results.with_near_vector(
                 content={"vector": vector},
             ).do()
@@ -472,18 +931,23 @@ class Embedder(Component):
 
         if "data" not in query_results:
             logger.warning(query_results)
+            local_cache.record("misses")
             return None, None
 
         results = query_results["data"]["Get"][self.get_cache_class()]
 
         if not results:
+            local_cache.record("misses")
             return None, None
 
         result = results[0]
 
         if float(result["_additional"]["distance"]) > dist:
+            local_cache.record("misses")
             return None, None
         logger.info("Retrieved similar from cache")
+        local_cache.record("remote_hits")
+        local_cache.put(query, result["system"], vector)
         return result["system"], float(result["_additional"]["distance"])
 
 
@@ -495,6 +959,7 @@ class Embedder(Component):
         ):
         """
         Adds a query and its corresponding system response to the semantic cache.
+        The local tier is written first and the entry is written through to Weaviate.
 
         Parameters:
             client (Client): The Weaviate client used to interact with the semantic cache.
@@ -505,6 +970,9 @@ class Embedder(Component):
             None
         """
         needs_vectorization = self.get_need_vectorization()
+        vector = self.get_query_vector(query) if needs_vectorization else None
+        if system:
+            get_local_semantic_cache(self.get_cache_class()).put(query, system, vector)
 
         with client.batch as batch:
             batch.batch_size = 1
@@ -512,7 +980,6 @@ class Embedder(Component):
             logger.info("Saved to cache")
 
             if needs_vectorization:
-                vector = self.vectorize_query(query)
                 client.batch.add_data_object(
                     properties, self.get_cache_class(), vector=vector
                 )
@@ -7,12 +7,17 @@ from typing import List
 from loguru import logger
 
 from typing_extensions import Dict
+from src.vectordb.component import benchmark_startup, check_components, get_shared_component
 from src.vectordb.embedders.interface import Embedder
 from src.vectordb.readers.document import Document
-from src.vectordb.embedders.ADAEmbedder import ADAEmbedder
-from src.vectordb.embedders.CohereEmbedder import CohereEmbedder
-from src.vectordb.embedders.SentenceEmbedder import SentenceEmbedder
-from src.vectordb.embedders.MiniLMEmebdder import MiniLMEmbedder
+
+# Embedders are imported and constructed on first use, see get_shared_component
+EMBEDDERS: Dict[str, str] = {
+    "MiniLMEmbedder": "src.vectordb.embedders.MiniLMEmbedder:MiniLMEmbedder",
+    "ADAEmbedder": "src.vectordb.embedders.ADAEmbedder:ADAEmbedder",
+    "CohereEmbedder": "src.vectordb.embedders.CohereEmbedder:CohereEmbedder",
+    "SentenceEmbedder": "src.vectordb.embedders.SentenceEmbedder:SentenceEmbedder",
+}
 
 
 class EmbeddingManager:
@@ -21,15 +26,18 @@ class EmbeddingManager:
     """
     def __init__(self):
         """
-        Constructor for EmbeddingManager class. Initializes the embedders dictionary with different Embedder instances and sets the selected embedder to ADAEmbedder by default.
+        Constructor for EmbeddingManager class. Registers the available embedders and selects ADAEmbedder by default.
+        No embedder is constructed until it is selected or used, and constructed embedders are shared process-wide.
+        """
+        self.embedders: Dict[str, str] = dict(EMBEDDERS)
+        self.selected_embedder_name = "ADAEmbedder"
+
+    @property
+    def selected_embedder(self) -> Embedder:
+        """
+        The selected embedder, constructed on first use.
         """
-        self.embedders: Dict[str, Embedder] = {
-            "MiniLMEmbedder": MiniLMEmbedder(),
-            "ADAEmbedder": ADAEmbedder(),
-            "CohereEmbedder": CohereEmbedder(),
-            "SentenceEmbedder": SentenceEmbedder(),
-        }
-        self.selected_embedder: Embedder = self.embedders["ADAEmbedder"]
+        return get_shared_component(self.embedders[self.selected_embedder_name])
 
     def embed(
         self,
@@ -61,7 +69,8 @@ class EmbeddingManager:
             bool: True if the embedder is found and set successfully, False otherwise.
         """
         if embedder in self.embedders:
-            self.selected_embedder = self.embedders[embedder]
+            self.selected_embedder_name = embedder
+            get_shared_component(self.embedders[embedder])
             return True
         else:
             logger.warning(f"Embedder {embedder} not found")
@@ -69,9 +78,28 @@ class EmbeddingManager:
 
     def get_embedders(self) -> Dict[str, Embedder]:
         """
-        Get the dictionary of embedders.
+        Get the dictionary of embedders. This constructs every embedder, use get_embedder_names to only list them.
 
         Returns:
             Dict[str, Embedder]: A dictionary where the keys are strings representing the names of the embedders and the values are instances of the Embedder class.
         """
-        return self.embedders
+        return {name: get_shared_component(path) for name, path in self.embedders.items()}
+
+    def get_embedder_names(self) -> List[str]:
+        """
+        Get the names of the available embedders without constructing them.
+
+        Returns:
+            List[str]: The names of the embedders.
+        """
+        return list(self.embedders)
+
+
+if __name__ == "__main__":
+    errors = check_components(EMBEDDERS)
+    for name, error in errors.items():
+        logger.error(f"{name}: {error}")
+    if errors:
+        raise SystemExit(1)
+    for path, seconds in benchmark_startup(list(EMBEDDERS.values())).items():
+        logger.info(f"{path}: import {seconds['import']:.2f}s, construct {seconds['construct']:.2f}s")
@@ -0,0 +1,112 @@
+"""
+MiniLM backend benchmark and parity check. Vectorizes a sample with the torch, onnx and int8 onnx
+backends of MiniLMEmbedder and fails if an onnx backend drifts from torch.
+
+Usage: python -m src.vectordb.embedders.minilm_parity sample.txt
+The sample is split into chunks on blank lines.
+"""
+import multiprocessing
+import sys
+import time
+import torch
+from typing import Dict, List, Union
+from loguru import logger
+
+from src.vectordb.embedders.MiniLMEmbedder import MINILM_BATCH_SIZE, MiniLMEmbedder
+
+# Minimum cosine similarity of every onnx vector to its torch vector in compare_backends
+MINILM_MIN_COSINE = 0.99
+
+
+def benchmark_backend(backend: str, quantize: bool, texts: List[str]) -> Dict:
+    """
+    Vectorizes the texts with one backend and measures its throughput and peak RSS.
+
+    Parameters:
+        backend (str): "torch" or "onnx".
+        quantize (bool): Whether the onnx backend runs the int8 quantized export.
+        texts (List[str]): The chunk texts to vectorize.
+
+    Returns:
+        Dict: The vectors, chunks per second and peak RSS in MB, None where it cannot be measured.
+    """
+    embedder = MiniLMEmbedder(backend=backend, quantize=quantize)
+    embedder.vectorize_chunks(texts[:MINILM_BATCH_SIZE])  # warm up
+    start = time.perf_counter()
+    vectors = embedder.vectorize_chunks(texts)
+    elapsed = time.perf_counter() - start
+    return {
+        "vectors": vectors,
+        "chunks_per_second": len(texts) / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def peak_rss_mb() -> Union[float, None]:
+    """
+    Returns the peak RSS of the current process in MB, or None on platforms without the resource module.
+    """
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
+def compare_backends(texts: List[str]) -> Dict[str, Dict]:
+    """
+    Benchmarks the torch, onnx and int8 onnx backends, each in a fresh process so their RSS
+    is measured separately, and checks the onnx vectors against the torch vectors.
+
+    Parameters:
+        texts (List[str]): The chunk texts to vectorize.
+
+    Returns:
+        Dict[str, Dict]: Per backend its chunks per second, peak RSS and minimum cosine
+        similarity to the torch vectors.
+
+    Raises:
+        ValueError: If the minimum cosine similarity of a backend is below MINILM_MIN_COSINE.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for label, backend, quantize in (
+        ("torch", "torch", False),
+        ("onnx", "onnx", False),
+        ("onnx-int8", "onnx", True),
+    ):
+        with context.Pool(1) as pool:
+            results[label] = pool.apply(benchmark_backend, (backend, quantize, texts))
+
+    reference = torch.tensor(results["torch"]["vectors"])
+    for result in results.values():
+        vectors = torch.tensor(result.pop("vectors"))
+        result["min_cosine"] = float(
+            torch.nn.functional.cosine_similarity(vectors, reference).min()
+        )
+
+    for label, result in results.items():
+        peak_rss = result["peak_rss_mb"]
+        logger.info(
+            f"{label}: {result['chunks_per_second']:.1f} chunks/s, "
+            f"peak RSS {f'{peak_rss:.0f} MB' if peak_rss is not None else 'n/a'}, "
+            f"min cosine {result['min_cosine']:.4f}"
+        )
+    failed = {
+        label: result["min_cosine"]
+        for label, result in results.items()
+        if result["min_cosine"] < MINILM_MIN_COSINE
+    }
+    if failed:
+        raise ValueError(
+            f"Backends below the minimum cosine similarity of {MINILM_MIN_COSINE} to torch: {failed}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8") as file:
+        sample = [paragraph for paragraph in file.read().split("\n\n") if paragraph.strip()]
+    compare_backends(sample)
@@ -0,0 +1,88 @@
+"""
+Query Vector Cache. Keeps the vectors of recently embedded queries in process.
+"""
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+# Number of query vectors kept before the least recently used one is evicted
+QUERY_VECTOR_CACHE_SIZE = int(os.getenv("QUERY_VECTOR_CACHE_SIZE", "4096"))
+# Store vectors as float16 to halve the memory of the cache
+QUERY_VECTOR_CACHE_FP16 = os.getenv("QUERY_VECTOR_CACHE_FP16", "false").lower() in ("1", "true")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Collapses whitespace so queries differing only in spacing share a vector.
+    Case is kept, not every vectorizer is case insensitive.
+    """
+    return " ".join(query.split())
+
+
+class QueryVectorCache:
+    """
+    Bounded LRU cache of query vectors keyed by vectorizer, model version and normalized query text,
+    like the embedding cache, so client-side backends sharing a vectorizer never share vectors.
+    """
+
+    def __init__(self, max_size: int = QUERY_VECTOR_CACHE_SIZE, fp16: bool = QUERY_VECTOR_CACHE_FP16):
+        """
+        Initializes the cache.
+
+        Args:
+            max_size (int): The maximum number of vectors kept, 0 disables the cache.
+            fp16 (bool): Whether vectors are stored as half precision floats.
+
+        Returns:
+            None
+        """
+        self.max_size = max_size
+        self.fp16 = fp16
+        self.entries: OrderedDict[Tuple[str, str, str], Union[array, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def pack(self, vector: List[float]) -> Union[array, bytes]:
+        if self.fp16:
+            return struct.pack(f"{len(vector)}e", *vector)
+        return array("f", vector)
+
+    def unpack(self, packed: Union[array, bytes]) -> List[float]:
+        if self.fp16:
+            return list(struct.unpack(f"{len(packed) // 2}e", packed))
+        return packed.tolist()
+
+    def get(self, vectorizer: str, model_version: str, query: str) -> Optional[List[float]]:
+        """
+        Returns the cached vector of a query, or None on a miss.
+        """
+        key = (vectorizer, model_version, normalize_query(query))
+        with self.lock:
+            packed = self.entries.get(key)
+            if packed is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return self.unpack(packed)
+
+    def set(self, vectorizer: str, model_version: str, query: str, vector: List[float]):
+        """
+        Stores the vector of a query, evicting the least recently used vectors above max_size.
+        """
+        if self.max_size <= 0:
+            return
+        key = (vectorizer, model_version, normalize_query(query))
+        packed = self.pack(vector)
+        with self.lock:
+            self.entries[key] = packed
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+# Shared by every embedder in the process
+query_vector_cache = QueryVectorCache()
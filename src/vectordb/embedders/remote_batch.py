@@ -0,0 +1,188 @@
+"""
+Remote Batch Embedding. Packs chunks into token-bounded requests to an embedding API
+and sends them concurrently under a tokens-per-minute rate limit.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import tiktoken
+from loguru import logger
+
+from src.vectordb.chunkers.chunk import Chunk
+
+# Embedding requests in flight at the same time per embedder
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+# Attempts of a request that is rate limited (HTTP 429)
+EMBEDDING_RETRIES = int(os.getenv("EMBEDDING_RETRIES", "6"))
+# Base delay in seconds of the retry backoff, doubled on every attempt and jittered
+EMBEDDING_BACKOFF = float(os.getenv("EMBEDDING_BACKOFF", "1"))
+
+encoding = tiktoken.get_encoding("cl100k_base")
+
+
+class TokenRateLimiter:
+    """
+    Token bucket refilled at tokens_per_minute, shared by the threads sending requests.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initializes the limiter with a full bucket.
+
+        Args:
+            tokens_per_minute (int): The provider's tokens per minute limit.
+
+        Returns:
+            None
+        """
+        self.capacity = float(tokens_per_minute)
+        self.available = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        """
+        Blocks until the bucket holds `tokens`, then takes them.
+        """
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.available = min(
+                    self.capacity,
+                    self.available + (now - self.updated) * self.capacity / 60,
+                )
+                self.updated = now
+                if self.available >= tokens:
+                    self.available -= tokens
+                    return
+                wait = (tokens - self.available) * 60 / self.capacity
+            time.sleep(wait)
+
+
+def count_tokens(chunk: Chunk) -> int:
+    """
+    Returns the tiktoken count of a chunk, encoding its text only if the chunker did not count it.
+    """
+    tokens = chunk.tokens
+    if isinstance(tokens, int) and tokens > 0:
+        return tokens
+    if tokens:
+        return len(tokens)
+    return len(encoding.encode(chunk.text, disallowed_special=()))
+
+
+def pack_requests(token_counts: List[int], max_tokens: int, max_inputs: int) -> List[List[int]]:
+    """
+    Packs consecutive inputs into requests of at most max_tokens tokens and max_inputs inputs.
+    An input larger than max_tokens gets a request of its own.
+
+    Args:
+        token_counts (List[int]): The token count of every input.
+        max_tokens (int): The token limit of a request.
+        max_inputs (int): The input limit of a request.
+
+    Returns:
+        List[List[int]]: The input indices of every request.
+    """
+    requests = []
+    current = []
+    current_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            requests.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        requests.append(current)
+    return requests
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """
+    Whether an API client error is an HTTP 429, openai and cohere both expose the status code.
+    """
+    return getattr(error, "status_code", None) == 429 or getattr(error, "http_status", None) == 429
+
+
+def embed_texts(
+    texts: List[str],
+    token_counts: List[int],
+    request: Callable[[List[str]], List[List[float]]],
+    limiter: TokenRateLimiter,
+    max_tokens: int,
+    max_inputs: int,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+) -> List[List[float]]:
+    """
+    Embeds texts with token-bounded requests sent concurrently under the rate limiter.
+    Rate limited requests are retried with jittered exponential backoff.
+
+    Args:
+        texts (List[str]): The texts to embed.
+        token_counts (List[int]): The token count of every text.
+        request (Callable[[List[str]], List[List[float]]]): Sends one embedding request and returns its vectors.
+        limiter (TokenRateLimiter): The rate limiter of the provider.
+        max_tokens (int): The token limit of a request.
+        max_inputs (int): The input limit of a request.
+        concurrency (int): The number of requests in flight.
+
+    Returns:
+        List[List[float]]: One vector per text, in the order of the texts.
+    """
+    vectors: List[List[float]] = [None] * len(texts)
+
+    def send(indices: List[int]):
+        limiter.acquire(sum(token_counts[index] for index in indices))
+        for attempt in range(EMBEDDING_RETRIES):
+            try:
+                batch_vectors = request([texts[index] for index in indices])
+                break
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == EMBEDDING_RETRIES - 1:
+                    raise
+                delay = EMBEDDING_BACKOFF * (2**attempt) + random.uniform(0, EMBEDDING_BACKOFF)
+                logger.warning(f"Embedding request rate limited, retrying in {delay:.1f}s")
+                time.sleep(delay)
+        for index, vector in zip(indices, batch_vectors):
+            vectors[index] = vector
+
+    requests = pack_requests(token_counts, max_tokens, max_inputs)
+    logger.info(f"Embedding {len(texts)} chunks with {len(requests)} requests")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for future in [executor.submit(send, indices) for indices in requests]:
+            future.result()
+    return vectors
+
+
+def embed_chunks(
+    chunks: List[Chunk],
+    request: Callable[[List[str]], List[List[float]]],
+    limiter: TokenRateLimiter,
+    max_tokens: int,
+    max_inputs: int,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+):
+    """
+    Embeds the chunks that have no vector yet and sets their vectors with Chunk.set_vector.
+    """
+    missing = [chunk for chunk in chunks if chunk.vector is None]
+    if not missing:
+        return
+    vectors = embed_texts(
+        [chunk.text for chunk in missing],
+        [count_tokens(chunk) for chunk in missing],
+        request,
+        limiter,
+        max_tokens,
+        max_inputs,
+        concurrency,
+    )
+    for chunk, vector in zip(missing, vectors):
+        chunk.set_vector(vector)
@@ -0,0 +1,141 @@
+"""
+Local Semantic Cache. In-process tier in front of the Cache_* classes in Weaviate.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Number of cached queries kept per cache class before the least recently used one is evicted
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+
+
+class LocalSemanticCache:
+    """
+    LRU map of query to system response with a brute force cosine index over the query vectors.
+    Distances are cosine distances, the same metric the Cache_* classes use in Weaviate.
+    """
+
+    def __init__(self, max_size: int = SEMANTIC_CACHE_SIZE):
+        """
+        Initializes the cache.
+
+        Args:
+            max_size (int): The maximum number of queries kept.
+
+        Returns:
+            None
+        """
+        self.max_size = max_size
+        self.entries: OrderedDict[str, Tuple[str, Optional[int]]] = OrderedDict()
+        self.matrix: Optional[np.ndarray] = None
+        self.row_queries: List[Optional[str]] = [None] * max_size
+        self.free_rows = list(range(max_size - 1, -1, -1))
+        self.valid = np.zeros(max_size, dtype=bool)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"exact_hits": 0, "vector_hits": 0, "remote_hits": 0, "misses": 0}
+
+    def hit_ratio(self) -> float:
+        """
+        Returns the share of lookups answered by either tier.
+        """
+        hits = self.stats["exact_hits"] + self.stats["vector_hits"] + self.stats["remote_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def record(self, outcome: str):
+        """
+        Counts a lookup answered outside the local tier, a remote hit or a miss.
+        """
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def get_exact(self, query: str) -> Optional[str]:
+        """
+        Returns the cached system response of exactly this query.
+        """
+        with self.lock:
+            entry = self.entries.get(query)
+            if entry is None:
+                return None
+            self.entries.move_to_end(query)
+            self.stats["exact_hits"] += 1
+            return entry[0]
+
+    def get_similar(self, vector: List[float], dist: float) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Returns the system response of the nearest cached query and its distance,
+        or (None, None) if no cached query is within dist.
+        """
+        with self.lock:
+            if self.matrix is None or not self.valid.any():
+                return None, None
+            query_vector = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query_vector)
+            if len(query_vector) != self.matrix.shape[1] or norm == 0:
+                return None, None
+            similarities = self.matrix @ (query_vector / norm)
+            similarities[~self.valid] = -np.inf
+            row = int(np.argmax(similarities))
+            distance = float(1.0 - similarities[row])
+            if distance > dist:
+                return None, None
+            query = self.row_queries[row]
+            self.entries.move_to_end(query)
+            self.stats["vector_hits"] += 1
+            return self.entries[query][0], distance
+
+    def put(self, query: str, system: str, vector: Optional[List[float]] = None):
+        """
+        Caches the system response of a query, indexing its vector when given.
+        """
+        with self.lock:
+            if query in self.entries:
+                self._remove(query)
+            row = None
+            if vector is not None:
+                row = self._index(query, vector)
+            self.entries[query] = (system, row)
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def _index(self, query: str, vector: List[float]) -> Optional[int]:
+        query_vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm == 0:
+            return None
+        if self.matrix is None:
+            self.matrix = np.zeros((self.max_size, len(query_vector)), dtype=np.float32)
+        if len(query_vector) != self.matrix.shape[1]:
+            return None
+        if not self.free_rows:
+            self._remove(next(iter(self.entries)))
+        row = self.free_rows.pop()
+        self.matrix[row] = query_vector / norm
+        self.row_queries[row] = query
+        self.valid[row] = True
+        return row
+
+    def _remove(self, query: str):
+        _, row = self.entries.pop(query)
+        if row is not None:
+            self.matrix[row] = 0.0
+            self.row_queries[row] = None
+            self.valid[row] = False
+            self.free_rows.append(row)
+
+
+local_semantic_caches: Dict[str, LocalSemanticCache] = {}
+local_semantic_caches_lock = threading.Lock()
+
+
+def get_local_semantic_cache(cache_class: str) -> LocalSemanticCache:
+    """
+    Returns the process-wide local tier of a Cache_* class.
+    """
+    with local_semantic_caches_lock:
+        if cache_class not in local_semantic_caches:
+            local_semantic_caches[cache_class] = LocalSemanticCache()
+        return local_semantic_caches[cache_class]
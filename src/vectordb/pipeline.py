@@ -0,0 +1,292 @@
+"""
+Ingestion Pipeline. Streams documents through read, chunk, embed and import stages.
+"""
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from loguru import logger
+from weaviate.client import Client
+
+from src.vectordb.chunkers.interface import Chunker
+from src.vectordb.embedders.interface import Embedder
+from src.vectordb.readers.document import Document
+from src.vectordb.readers.interface import Reader
+
+# Items buffered between two stages, bounds the documents held in memory
+PIPELINE_QUEUE_DEPTH = int(os.getenv("PIPELINE_QUEUE_DEPTH", "64"))
+PIPELINE_READ_WORKERS = int(os.getenv("PIPELINE_READ_WORKERS", "2"))
+PIPELINE_CHUNK_WORKERS = int(os.getenv("PIPELINE_CHUNK_WORKERS", "2"))
+PIPELINE_EMBED_WORKERS = int(os.getenv("PIPELINE_EMBED_WORKERS", "1"))
+# Documents vectorized together, so embedders can batch their chunks
+PIPELINE_EMBED_BATCH = int(os.getenv("PIPELINE_EMBED_BATCH", "16"))
+# Documents per import_data call
+PIPELINE_IMPORT_BATCH = int(os.getenv("PIPELINE_IMPORT_BATCH", "64"))
+# Seconds between throughput reports
+PIPELINE_REPORT_INTERVAL = float(os.getenv("PIPELINE_REPORT_INTERVAL", "30"))
+
+# Marks the end of a stage's input
+DONE = object()
+
+
+class Stage:
+    """
+    A pool of worker threads consuming a bounded input queue and feeding the next stage's queue.
+    Workers block on a full output queue, which propagates backpressure up to the source.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[List], Iterable],
+        workers: int,
+        batch_size: int = 1,
+        queue_depth: int = PIPELINE_QUEUE_DEPTH,
+        failed: Optional[threading.Event] = None,
+    ):
+        """
+        Initializes the stage.
+
+        Args:
+            name (str): The name of the stage in throughput reports.
+            process (Callable[[List], Iterable]): Processes a batch of input items and returns the output items.
+            workers (int): The number of worker threads.
+            batch_size (int): The number of input items handed to process at once.
+            queue_depth (int): The capacity of the input queue.
+            failed (Optional[threading.Event]): Set by the first failing stage of a pipeline, shared by all of its stages.
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.process = process
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.input: queue.Queue = queue.Queue(maxsize=queue_depth)
+        self.output: Optional[queue.Queue] = None
+        self.next_workers = 0
+        self.threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.items = 0
+        self.busy = 0.0
+        self.error: Optional[BaseException] = None
+        self.failed = failed if failed is not None else threading.Event()
+
+    def start(self, output: Optional["Stage"]):
+        self.output = output.input if output is not None else None
+        self.next_workers = output.workers if output is not None else 0
+        self.running = self.workers
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self.work, name=f"{self.name}-{index}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def work(self):
+        batch = []
+        while True:
+            item = self.input.get()
+            if item is not DONE:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or item is DONE):
+                self.run(batch)
+                batch = []
+            if item is DONE:
+                break
+        with self.lock:
+            self.running -= 1
+            last = self.running == 0
+        if last and self.output is not None:
+            # the last worker to finish tells every worker of the next stage
+            for _ in range(self.next_workers):
+                self.output.put(DONE)
+
+    def run(self, batch: List):
+        if self.failed.is_set():
+            # drain without processing once any stage failed, so no stage keeps reading,
+            # chunking or paying for embeddings and upstream stages never block
+            return
+        start = time.perf_counter()
+        try:
+            results = list(self.process(batch))
+        except Exception as e:
+            logger.exception(f"Pipeline stage {self.name} failed")
+            self.error = e
+            self.failed.set()
+            return
+        with self.lock:
+            self.items += len(batch)
+            self.busy += time.perf_counter() - start
+        if self.output is not None:
+            for result in results:
+                self.output.put(result)
+
+    def report(self, elapsed: float) -> str:
+        with self.lock:
+            items, busy = self.items, self.busy
+        return (
+            f"{self.name}: {items} items, {items / elapsed if elapsed else 0:.1f}/s, "
+            f"{busy / elapsed / self.workers * 100 if elapsed else 0:.0f}% busy, "
+            f"queue {self.input.qsize()}/{self.input.maxsize}"
+        )
+
+
+def iter_paths(paths: Iterable[str], file_types: List[str]) -> Iterator[str]:
+    """
+    Expands directories to the files a reader can load, so files are read one at a time.
+    """
+    for path in paths:
+        data_path = Path(path)
+        if data_path.is_dir():
+            for file_path in sorted(data_path.rglob("*")):
+                if file_path.is_file() and (not file_types or file_path.suffix in file_types):
+                    yield str(file_path)
+        elif data_path.exists():
+            yield str(data_path)
+        else:
+            logger.warning(f"Path {data_path} does not exist")
+
+
+class IngestionPipeline:
+    """
+    Streaming read, chunk, embed and import pipeline. Each stage runs in its own worker pool and the
+    stages are connected by bounded queues, so memory is bounded by the queue depths instead of the
+    size of the corpus.
+    """
+
+    def __init__(
+        self,
+        reader: Reader,
+        chunker: Chunker,
+        embedder: Embedder,
+        client: Client,
+        units: int,
+        overlap: int,
+        document_type: str = "Documentation",
+        queue_depth: int = PIPELINE_QUEUE_DEPTH,
+    ):
+        """
+        Initializes the pipeline.
+
+        Args:
+            reader (Reader): Loads the documents of a path.
+            chunker (Chunker): Chunks the documents.
+            embedder (Embedder): Vectorizes the chunks and imports the documents.
+            client (Client): The Weaviate client documents are imported with.
+            units (int): The number of units per chunk.
+            overlap (int): The amount of overlap between chunks.
+            document_type (str): The type of the loaded documents.
+            queue_depth (int): The capacity of the queue in front of every stage.
+
+        Returns:
+            None
+        """
+        self.reader = reader
+        self.chunker = chunker
+        self.embedder = embedder
+        self.client = client
+        self.units = units
+        self.overlap = overlap
+        self.document_type = document_type
+        self.imported = 0
+        self.failed = threading.Event()
+        # import_data shares client.batch, so the import stage has a single worker
+        self.stages = [
+            Stage(
+                "read", self.read, PIPELINE_READ_WORKERS, queue_depth=queue_depth, failed=self.failed
+            ),
+            Stage(
+                "chunk", self.chunk, PIPELINE_CHUNK_WORKERS, queue_depth=queue_depth, failed=self.failed
+            ),
+            Stage(
+                "embed",
+                self.embed,
+                PIPELINE_EMBED_WORKERS,
+                batch_size=PIPELINE_EMBED_BATCH,
+                queue_depth=queue_depth,
+                failed=self.failed,
+            ),
+            Stage(
+                "import",
+                self.import_documents,
+                1,
+                batch_size=PIPELINE_IMPORT_BATCH,
+                queue_depth=queue_depth,
+                failed=self.failed,
+            ),
+        ]
+
+    def read(self, paths: List[str]) -> List[Document]:
+        return self.reader.load(
+            bites=[], contents=[], paths=paths, file_names=[], document_type=self.document_type
+        )
+
+    def chunk(self, documents: List[Document]) -> List[Document]:
+        return self.chunker.chunk(documents, self.units, self.overlap)
+
+    def embed(self, documents: List[Document]) -> List[Document]:
+        self.embedder.vectorize_documents(documents)
+        return documents
+
+    def import_documents(self, documents: List[Document]) -> List[Document]:
+        if not self.embedder.import_data(documents, self.client):
+            raise ValueError(f"Importing {len(documents)} documents failed")
+        self.imported += len(documents)
+        return []
+
+    def run(self, paths: Iterable[str]) -> int:
+        """
+        Streams the files under the given paths through the pipeline.
+
+        Args:
+            paths (Iterable[str]): Files or directories to ingest.
+
+        Returns:
+            int: The number of imported documents.
+
+        Raises:
+            ValueError: If a stage failed, every stage drains the remaining documents without processing them.
+        """
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            stage.start(next_stage)
+
+        started = time.perf_counter()
+        finished = threading.Event()
+        reporter = threading.Thread(
+            target=self.report_until, args=(finished, started), daemon=True
+        )
+        reporter.start()
+
+        source = self.stages[0]
+        for path in iter_paths(paths, self.reader.file_types):
+            if self.failed.is_set():
+                break
+            source.input.put(path)
+        for _ in range(source.workers):
+            source.input.put(DONE)
+        for stage in self.stages:
+            for thread in stage.threads:
+                thread.join()
+
+        finished.set()
+        self.report(time.perf_counter() - started)
+        for stage in self.stages:
+            if stage.error is not None:
+                raise ValueError(f"Pipeline stage {stage.name} failed: {stage.error}") from stage.error
+        return self.imported
+
+    def report_until(self, finished: threading.Event, started: float):
+        while not finished.wait(PIPELINE_REPORT_INTERVAL):
+            self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float):
+        logger.info(
+            f"Pipeline after {elapsed:.0f}s: "
+            + " | ".join(stage.report(elapsed) for stage in self.stages)
+        )
@@ -4,6 +4,8 @@ https://github.com/weaviate/Verba
 """
 from typing_extensions import List, Dict, Optional
 
+import numpy as np
+
 from src.vectordb.chunkers.chunk import Chunk
 
 
@@ -11,6 +13,19 @@ class Document:
     """
     Document class. Standard document for data ingestion into Vectordb.
     """
+    __slots__ = (
+        "_text",
+        "_doc_type",
+        "_name",
+        "_path",
+        "_link",
+        "_timestamp",
+        "_reader",
+        "_meta",
+        "_vectors",
+        "chunks",
+    )
+
     def __init__(
         self,
         text: Optional[str] = "",
@@ -48,6 +63,7 @@ class Document:
         self._timestamp = timestamp
         self._reader = reader
         self._meta = meta
+        self._vectors = None
         self.chunks: List[Chunk] = []
 
     @property
@@ -130,6 +146,34 @@ class Document:
         """
         return self._meta
 
+    @property
+    def vectors(self):
+        """
+        Get the vectors of the chunks as one contiguous float32 matrix, set by pack_vectors.
+
+        Returns:
+            The (chunks, dimensions) matrix, or None if the vectors are not packed.
+        """
+        return self._vectors
+
+    def pack_vectors(self):
+        """
+        Copies the vectors of the chunks into one contiguous float32 matrix and replaces every
+        chunk vector with a view of its row, so a document holds a single buffer instead of one
+        object per chunk. Nothing is packed unless every chunk has a vector of the same length.
+
+        Returns:
+            None
+        """
+        vectors = [chunk.vector for chunk in self.chunks]
+        if not vectors or any(vector is None for vector in vectors):
+            return
+        if len({len(vector) for vector in vectors}) != 1:
+            return
+        self._vectors = np.stack(vectors).astype(np.float32, copy=False)
+        for chunk, row in zip(self.chunks, self._vectors):
+            chunk.set_vector(row)
+
     @staticmethod
     def to_json(document) -> Dict:
         """
@@ -4,7 +4,6 @@ https://github.com/weaviate/Verba
 """
 from typing_extensions import List, Tuple
 from weaviate.client import Client
-from weaviate.hybrid import HybridFusion
 
 from src.vectordb.retrievers.interface import Retriever
 from src.vectordb.embedders.interface import Embedder
@@ -33,56 +32,7 @@ class SimpleRetriever(Retriever):
         @parameter: embedder : Embedder - Current selected Embedder
         @returns List[Chunk] - List of retrieved chunks.
         """
-        chunk_class = embedder.get_chunk_class()
-        needs_vectorization = embedder.get_need_vectorization()
-        chunks = []
-
-        for query in queries:
-            query_results = (
-                client.query.get(
-                    class_name=chunk_class,
-                    properties=[
-                        "text",
-                        "doc_name",
-                        "chunk_id",
-                        "doc_uuid",
-                        "doc_type",
-                    ],
-                )
-                .with_additional(properties=["score"])
-                .with_autocut(2)
-            )
-
-            if needs_vectorization:
-                vector = embedder.vectorize_query(query)
-                query_results = query_results.with_hybrid(
-                    query=query,
-                    vector=vector,
-                    fusion_type=HybridFusion.RELATIVE_SCORE,
-                    properties=[
-                        "text",
-                    ],
-                ).do()
-
-            else:
-                query_results = query_results.with_hybrid(
-                    query=query,
-                    fusion_type=HybridFusion.RELATIVE_SCORE,
-                    properties=[
-                        "text",
-                    ],
-                ).do()
-
-            for chunk in query_results["data"]["Get"][chunk_class]:
-                chunk_obj = Chunk(
-                    chunk["text"],
-                    chunk["doc_name"],
-                    chunk["doc_type"],
-                    chunk["doc_uuid"],
-                    chunk["chunk_id"],
-                )
-                chunk_obj.set_score(chunk["_additional"]["score"])
-                chunks.append(chunk_obj)
+        chunks = self.search_queries(queries, client, embedder)
 
         sorted_chunks = self.sort_chunks(chunks)
 
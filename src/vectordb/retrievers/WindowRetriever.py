@@ -3,8 +3,7 @@ Window Retriever. Based one Weaviate's Verba.
 https://github.com/weaviate/Verba
 """
 from weaviate.client import Client
-from weaviate.hybrid import HybridFusion
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from src.vectordb.embedders.interface import Embedder
 from src.vectordb.chunkers.chunk import Chunk
@@ -55,56 +54,7 @@ class WindowRetriever(Retriever):
             Tuple(List[Chunk], str): A Tuple containing a List of sorted chunks and the combined context string.
         """
 
-        chunk_class = embedder.get_chunk_class()
-        needs_vectorization = embedder.get_need_vectorization()
-        chunks = []
-
-        for query in queries:
-            query_results = (
-                client.query.get(
-                    class_name=chunk_class,
-                    properties=[
-                        "text",
-                        "doc_name",
-                        "chunk_id",
-                        "doc_uuid",
-                        "doc_type",
-                    ],
-                )
-                .with_additional(properties=["score"])
-                .with_autocut(2)
-            )
-
-            if needs_vectorization:
-                vector = embedder.vectorize_query(query)
-                query_results = query_results.with_hybrid(
-                    query=query,
-                    vector=vector,
-                    fusion_type=HybridFusion.RELATIVE_SCORE,
-                    properties=[
-                        "text",
-                    ],
-                ).do()
-
-            else:
-                query_results = query_results.with_hybrid(
-                    query=query,
-                    fusion_type=HybridFusion.RELATIVE_SCORE,
-                    properties=[
-                        "text",
-                    ],
-                ).do()
-
-            for chunk in query_results["data"]["Get"][chunk_class]:
-                chunk_obj = Chunk(
-                    chunk["text"],
-                    chunk["doc_name"],
-                    chunk["doc_type"],
-                    chunk["doc_uuid"],
-                    chunk["chunk_id"],
-                )
-                chunk_obj.set_score(chunk["_additional"]["score"])
-                chunks.append(chunk_obj)
+        chunks = self.search_queries(queries, client, embedder)
 
         sorted_chunks = self.sort_chunks(chunks)
 
@@ -132,8 +82,8 @@ class WindowRetriever(Retriever):
         Description:
             This function takes a List of chunks and combines their context by retrieving and adding surrounding chunks to a map.
             The function iterates over each chunk in the List and checks if its document name is already in the map. If not, it adds an empty Dictionary for that document name.
-            Then, for each chunk, it retrieves the chunk ID and creates a range of chunk IDs around it. It iterates over this range and checks if the chunk ID is not already in the map and not in the added chunks Dictionary.
-            If the conditions are met, it queries the Weaviate client for the chunk with the given chunk ID and document name. If the query returns a result, it creates a Chunk object from the result and adds it to the added chunks Dictionary.
+            Then, for each document, it collects the chunk IDs within the window around its retrieved chunks that are not already in the map.
+            All of those chunks are fetched with a single query per document, scoped by the document UUID, and added to the map.
             Finally, it combines the context of the added chunks and returns it as a string.
         """
         doc_name_map = {}
@@ -148,71 +98,24 @@ class WindowRetriever(Retriever):
 
         window = 2
         for doc, chunk_map in doc_name_map.items():
-            added_chunks = {}
-            for chunk in chunk_map:
-                chunk_id = int(chunk)
-                all_chunk_range = list(range(chunk_id - window, chunk_id + window + 1))
-                for _range in all_chunk_range:
-                    if (
-                        _range >= 0
-                        and _range not in chunk_map
-                        and _range not in added_chunks
-                    ):
-                        chunk_retrieval_results = (
-                            client.query.get(
-                                class_name=embedder.get_chunk_class(),
-                                properties=[
-                                    "text",
-                                    "doc_name",
-                                    "chunk_id",
-                                    "doc_uuid",
-                                    "doc_type",
-                                ],
-                            )
-                            .with_where(
-                                {
-                                    "operator": "And",
-                                    "operands": [
-                                        {
-                                            "path": ["chunk_id"],
-                                            "operator": "Equal",
-                                            "valueNumber": _range,
-                                        },
-                                        {
-                                            "path": ["doc_name"],
-                                            "operator": "Equal",
-                                            "valueText": chunk_map[chunk].doc_name,
-                                        },
-                                    ],
-                                }
-                            )
-                            .with_limit(1)
-                            .do()
-                        )
-
-                        if "data" in chunk_retrieval_results and chunk_retrieval_results["data"]["Get"][
-                                                        embedder.get_chunk_class()
-                                                    ]:
-                            chunk_obj = Chunk(
-                                chunk_retrieval_results["data"]["Get"][
-                                    embedder.get_chunk_class()
-                                ][0]["text"],
-                                chunk_retrieval_results["data"]["Get"][
-                                    embedder.get_chunk_class()
-                                ][0]["doc_name"],
-                                chunk_retrieval_results["data"]["Get"][
-                                    embedder.get_chunk_class()
-                                ][0]["doc_type"],
-                                chunk_retrieval_results["data"]["Get"][
-                                    embedder.get_chunk_class()
-                                ][0]["doc_uuid"],
-                                chunk_retrieval_results["data"]["Get"][
-                                    embedder.get_chunk_class()
-                                ][0]["chunk_id"],
-                            )
-                            added_chunks[str(_range)] = chunk_obj
-
-            for chunk in added_chunks:                    
+            hit_ids = {int(chunk_id) for chunk_id in chunk_map}
+            missing_ids = sorted(
+                {
+                    neighbour_id
+                    for chunk_id in hit_ids
+                    for neighbour_id in range(chunk_id - window, chunk_id + window + 1)
+                    if neighbour_id >= 0 and neighbour_id not in hit_ids
+                }
+            )
+            if not missing_ids:
+                continue
+
+            doc_uuid = next(iter(chunk_map.values())).doc_uuid
+            added_chunks = self.fetch_chunks(
+                client, embedder.get_chunk_class(), doc_uuid, missing_ids
+            )
+
+            for chunk in added_chunks:
                 if chunk not in doc_name_map[doc]:
                     doc_name_map[doc][chunk] = added_chunks[chunk]
 
@@ -226,3 +129,78 @@ class WindowRetriever(Retriever):
                 context += value.text
 
         return context
+
+    def fetch_chunks(
+        self,
+        client: Client,
+        chunk_class: str,
+        doc_uuid: str,
+        chunk_ids: List[int],
+    ) -> Dict[str, Chunk]:
+        """
+        Fetches the given chunks of one document in a single query.
+
+        Args:
+            client (Client): The Weaviate client used to query the database.
+            chunk_class (str): The class name of the chunks.
+            doc_uuid (str): The UUID of the document the chunks belong to.
+            chunk_ids (List[int]): The chunk IDs to fetch.
+
+        Returns:
+            Dict[str, Chunk]: The fetched chunks keyed by their chunk ID.
+        """
+        chunk_filters = [
+            {
+                "path": ["chunk_id"],
+                "operator": "Equal",
+                "valueNumber": chunk_id,
+            }
+            for chunk_id in chunk_ids
+        ]
+        chunk_filter = (
+            chunk_filters[0]
+            if len(chunk_filters) == 1
+            else {"operator": "Or", "operands": chunk_filters}
+        )
+
+        chunk_retrieval_results = (
+            client.query.get(
+                class_name=chunk_class,
+                properties=[
+                    "text",
+                    "doc_name",
+                    "chunk_id",
+                    "doc_uuid",
+                    "doc_type",
+                ],
+            )
+            .with_where(
+                {
+                    "operator": "And",
+                    "operands": [
+                        {
+                            "path": ["doc_uuid"],
+                            "operator": "Equal",
+                            "valueText": doc_uuid,
+                        },
+                        chunk_filter,
+                    ],
+                }
+            )
+            .with_limit(len(chunk_ids))
+            .do()
+        )
+
+        fetched_chunks = {}
+        if "data" not in chunk_retrieval_results:
+            return fetched_chunks
+        for result in chunk_retrieval_results["data"]["Get"][chunk_class] or []:
+            chunk_obj = Chunk(
+                result["text"],
+                result["doc_name"],
+                result["doc_type"],
+                result["doc_uuid"],
+                result["chunk_id"],
+            )
+            fetched_chunks[str(int(result["chunk_id"]))] = chunk_obj
+        return fetched_chunks
@@ -1,12 +1,19 @@
 import tiktoken
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from weaviate.client import Client
-from typing_extensions import List, Tuple
+from weaviate.gql.get import HybridFusion
+from typing_extensions import Dict, List, Optional, Tuple
 
 from src.vectordb.component import Component
 from src.vectordb.chunkers.chunk import Chunk
 from src.vectordb.embedders.interface import Embedder
 
+# Constant of reciprocal rank fusion, dampens the weight of the top ranks
+RRF_K = 60
+# Upper bound on hybrid searches sent at the same time
+MAX_CONCURRENT_QUERIES = 8
+
 
 class Retriever(Component):
     """
@@ -53,6 +60,130 @@ class Retriever(Component):
 
         raise NotImplementedError("load method must be implemented by a subclass.")
 
+    def hybrid_search(
+        self,
+        query: str,
+        vector: Optional[List[float]],
+        client: Client,
+        chunk_class: str,
+    ) -> List[Chunk]:
+        """
+        Run a single hybrid search and return its chunks in rank order.
+
+        Args:
+            query (str): The query to search for.
+            vector (Optional[List[float]]): The query vector, None lets Weaviate vectorize the query.
+            client (Client): The Weaviate client used to query the database.
+            chunk_class (str): The class name of the chunks.
+
+        Returns:
+            List[Chunk]: The retrieved chunks, best match first.
+        """
+        query_results = (
+            client.query.get(
+                class_name=chunk_class,
+                properties=[
+                    "text",
+                    "doc_name",
+                    "chunk_id",
+                    "doc_uuid",
+                    "doc_type",
+                ],
+            )
+            .with_additional(properties=["score"])
+            .with_autocut(2)
+        )
+
+        if vector is not None:
+            query_results = query_results.with_hybrid(
+                query=query,
+                vector=vector,
+                fusion_type=HybridFusion.RELATIVE_SCORE,
+                properties=[
+                    "text",
+                ],
+            ).do()
+        else:
+            query_results = query_results.with_hybrid(
+                query=query,
+                fusion_type=HybridFusion.RELATIVE_SCORE,
+                properties=[
+                    "text",
+                ],
+            ).do()
+
+        chunks = []
+        for chunk in query_results["data"]["Get"][chunk_class]:
+            chunk_obj = Chunk(
+                chunk["text"],
+                chunk["doc_name"],
+                chunk["doc_type"],
+                chunk["doc_uuid"],
+                chunk["chunk_id"],
+            )
+            chunk_obj.set_score(chunk["_additional"]["score"])
+            chunks.append(chunk_obj)
+        return chunks
+
+    def search_queries(
+        self,
+        queries: List[str],
+        client: Client,
+        embedder: Embedder,
+    ) -> List[Chunk]:
+        """
+        Vectorize all queries as one batch through the query vector cache, run their
+        hybrid searches concurrently and merge the results with reciprocal rank fusion.
+
+        Args:
+            queries (List[str]): A List of queries to search for chunks.
+            client (Client): The Weaviate client used to query the database.
+            embedder (Embedder): The embedder used to vectorize the queries.
+
+        Returns:
+            List[Chunk]: The unique retrieved chunks, scored by their fused rank.
+        """
+        if not queries:
+            return []
+        chunk_class = embedder.get_chunk_class()
+        if embedder.get_need_vectorization():
+            vectors = embedder.get_query_vectors(queries)
+        else:
+            vectors = [None] * len(queries)
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(queries), MAX_CONCURRENT_QUERIES)
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda args: self.hybrid_search(*args, client, chunk_class),
+                    zip(queries, vectors),
+                )
+            )
+        return self.reciprocal_rank_fusion(results)
+
+    def reciprocal_rank_fusion(self, results: List[List[Chunk]]) -> List[Chunk]:
+        """
+        Merge ranked chunk lists, a chunk found by several queries is kept once
+        and scored with the sum of 1 / (RRF_K + rank) over the lists it appears in.
+
+        Args:
+            results (List[List[Chunk]]): One ranked List of chunks per query.
+
+        Returns:
+            List[Chunk]: The merged chunks ordered by fused score.
+        """
+        fused: Dict[Tuple[str, str], Chunk] = {}
+        scores: Dict[Tuple[str, str], float] = {}
+        for chunks in results:
+            for rank, chunk in enumerate(chunks):
+                key = (chunk.doc_uuid, str(chunk.chunk_id))
+                fused.setdefault(key, chunk)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+        for key, chunk in fused.items():
+            chunk.set_score(scores[key])
+        return sorted(fused.values(), key=lambda chunk: chunk.score, reverse=True)
+
     def sort_chunks(self, chunks: List[Chunk]) -> List[Chunk]:
         """
         Sorts a List of chunks based on the doc_uuid and chunk_id.
@@ -13,6 +13,8 @@ load_dotenv()
 
 VECTORIZERS = {"text2vec-openai", "text2vec-cohere"}  # Needs to match with Weaviate modules
 EMBEDDINGS = {"MiniLM"}  # Custom Vectors
+# Pinned in the text2vec-cohere module config and used by the CohereEmbedder
+COHERE_EMBEDDING_MODEL = os.getenv("COHERE_EMBEDDING_MODEL", "embed-multilingual-v2.0")
 
 def strip_non_letters(s: str):
     """
@@ -72,6 +74,8 @@ def verify_vectorizer(
                     "resource_name": resource_name
             }
         }
+    elif vectorizer == "text2vec-cohere":
+        vectorizer_config = {"text2vec-cohere": {"model": COHERE_EMBEDDING_MODEL}}
 
     # Verify Vectorizer
     if vectorizer in VECTORIZERS: